@@ -3,6 +3,7 @@ Compliance & Safety Agent - Ensures all responses meet regulatory requirements
 """
 
 from typing import Dict, Any, List, Optional
+import asyncio
 import logging
 import re
 from .orchestrator import AgentState
@@ -218,3 +219,7 @@ class ComplianceAgent:
         agent_response["approved"] = compliance_checks["approved"]
         
         return agent_response
+    
+    async def avalidate_agent_response(self, agent_response: Dict[str, Any], agent_type: str) -> Dict[str, Any]:
+        """Async variant of validate_agent_response that runs off the event loop."""
+        return await asyncio.to_thread(self.validate_agent_response, agent_response, agent_type)
@@ -9,14 +9,10 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import numpy as np
 
-def normalize_portfolio_columns(df):
-    """Normalize column names to handle different CSV formats"""
-    
-    # Create a copy to avoid modifying the original
-    df_normalized = df.copy()
-    
-    # Column mapping for different formats
-    column_mapping = {
+# Column mapping for different formats (lowercased aliases per standard name)
+_COLUMN_ALIASES = {
+    standard_name: frozenset(v.lower() for v in variations)
+    for standard_name, variations in {
         # Symbol variations
         'symbol': ['symbol', 'ticker', 'stock', 'asset'],
         'quantity': ['quantity', 'qty', 'shares', 'units', 'amount'],
@@ -27,14 +23,25 @@ def normalize_portfolio_columns(df):
         'market_value': ['market_value', 'current_value', 'total_value'],
         'sector': ['sector', 'industry', 'category'],
         'asset_type': ['asset_type', 'type', 'instrument_type']
-    }
+    }.items()
+}
+
+def normalize_portfolio_columns(df):
+    """Normalize column names to handle different CSV formats"""
     
-    # Normalize column names
-    for standard_name, variations in column_mapping.items():
-        for col in df_normalized.columns:
-            if col.lower() in [v.lower() for v in variations]:
-                df_normalized = df_normalized.rename(columns={col: standard_name})
-                break
+    # Lowercase every column name in one pass, then claim the first
+    # unclaimed match for each standard name
+    lower_cols = df.columns.str.lower()
+    claimed = np.zeros(len(lower_cols), dtype=bool)
+    rename_map = {}
+    for standard_name, aliases in _COLUMN_ALIASES.items():
+        matches = np.flatnonzero(lower_cols.isin(aliases) & ~claimed)
+        if matches.size:
+            claimed[matches[0]] = True
+            rename_map[df.columns[matches[0]]] = standard_name
+    
+    # Rename returns a new frame, so the original is left untouched
+    df_normalized = df.rename(columns=rename_map)
     
     # Calculate missing columns if possible
     if 'cost_basis' not in df_normalized.columns and 'quantity' in df_normalized.columns and 'purchase_price' in df_normalized.columns:
@@ -50,6 +57,46 @@ def normalize_portfolio_columns(df):
     
     return df_normalized
 
+# Dtypes for manually entered holdings
+_MANUAL_HOLDING_DTYPES = {
+    'symbol': 'string',
+    'quantity': 'float64',
+    'cost_basis': 'float64',
+    'purchase_date': 'datetime64[ns]'
+}
+
+def get_holdings_df():
+    """Return the session's holdings DataFrame, building it from the records only once"""
+    if "holdings_df" not in st.session_state:
+        st.session_state.holdings_df = pd.DataFrame(st.session_state.portfolio_data["holdings"])
+    return st.session_state.holdings_df
+
+def add_holding(holding):
+    """Append a holding to the session records and the cached holdings DataFrame"""
+    holdings_df = get_holdings_df()
+    new_row = normalize_portfolio_columns(pd.DataFrame([holding])).astype(_MANUAL_HOLDING_DTYPES)
+    if holdings_df.empty:
+        st.session_state.holdings_df = new_row
+    else:
+        # Match the existing column dtypes (e.g. pyarrow-backed uploads) so concat doesn't degrade them,
+        # except integer columns, which a fractional manual quantity must not be truncated into
+        target_dtypes = {
+            col: dtype for col, dtype in holdings_df.dtypes.reindex(new_row.columns).dropna().items()
+            if not pd.api.types.is_integer_dtype(dtype)
+        }
+        new_row = new_row.astype(target_dtypes)
+        st.session_state.holdings_df = pd.concat([holdings_df, new_row], ignore_index=True)
+    st.session_state.portfolio_data["holdings"].append(new_row.to_dict('records')[0])
+
+def read_holdings_csv(uploaded_file):
+    """Read an uploaded holdings CSV, preferring the pyarrow parser"""
+    try:
+        return pd.read_csv(uploaded_file, engine='pyarrow', dtype_backend='pyarrow')
+    except ImportError:
+        # pyarrow not installed - rewind and fall back to the default C engine
+        uploaded_file.seek(0)
+        return pd.read_csv(uploaded_file)
+
 def render():
     """Render the Portfolio page."""
     st.title("📊 Portfolio Analysis")
@@ -80,12 +127,13 @@ def render():
     # Process uploaded data
     if uploaded_file is not None:
         try:
-            df = pd.read_csv(uploaded_file)
+            df = read_holdings_csv(uploaded_file)
             
             # Normalize column names to handle different CSV formats
             df = normalize_portfolio_columns(df)
             
             st.session_state.portfolio_data["holdings"] = df.to_dict('records')
+            st.session_state.holdings_df = df
             st.session_state.portfolio_data["last_updated"] = datetime.now().isoformat()
             st.success("Portfolio data uploaded successfully!")
             
@@ -117,7 +165,7 @@ def render():
                     'cost_basis': cost_basis,
                     'date': date.isoformat()
                 }
-                st.session_state.portfolio_data["holdings"].append(new_holding)
+                add_holding(new_holding)
                 st.success(f"Added {quantity} shares of {symbol}")
                 st.rerun()
             else:
@@ -127,8 +175,8 @@ def render():
     if st.session_state.portfolio_data["holdings"]:
         st.subheader("📈 Portfolio Analysis")
         
-        # Convert to DataFrame for analysis
-        holdings_df = pd.DataFrame(st.session_state.portfolio_data["holdings"])
+        # Reuse the cached DataFrame instead of rebuilding it on every render
+        holdings_df = get_holdings_df()
         
         # Basic metrics
         col1, col2, col3, col4 = st.columns(4)
@@ -260,12 +308,15 @@ def render():
                 avg_gain_loss_pct = holdings_df['gain_loss_pct'].mean()
                 st.metric("Avg Return %", f"{avg_gain_loss_pct:.2f}%")
             
+            # Locate best/worst positions on the raw ndarray (NaN-aware, like idxmax)
+            gain_loss_pct = holdings_df['gain_loss_pct'].to_numpy(dtype=float)
+            
             with col3:
-                best_performer = holdings_df.loc[holdings_df['gain_loss_pct'].idxmax()]
+                best_performer = holdings_df.iloc[int(np.nanargmax(gain_loss_pct))]
                 st.metric("Best Performer", f"{best_performer['symbol']} ({best_performer['gain_loss_pct']:.1f}%)")
             
             with col4:
-                worst_performer = holdings_df.loc[holdings_df['gain_loss_pct'].idxmin()]
+                worst_performer = holdings_df.iloc[int(np.nanargmin(gain_loss_pct))]
                 st.metric("Worst Performer", f"{worst_performer['symbol']} ({worst_performer['gain_loss_pct']:.1f}%)")
         
         # Mock performance data for charts
@@ -2,10 +2,13 @@
 LangGraph Workflow - Main workflow orchestration
 """
 
-from typing import Dict, Any, List, Optional, TypedDict
+from typing import Dict, Any, List, Optional
+from dataclasses import dataclass, field
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 from agents.orchestrator import OrchestratorAgent, AgentState, AgentType
 from agents.tutor import TutorAgent
@@ -15,22 +18,33 @@ from agents.compliance import ComplianceAgent
 
 logger = logging.getLogger(__name__)
 
-class FinnieState(TypedDict):
+def _run_sync(coro):
+    """Run a coroutine to completion from sync code, even when an event loop is already running."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # asyncio.run refuses to nest, so give the coroutine its own loop on a worker thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+@dataclass(slots=True)
+class FinnieState:
     """State definition for the Finnie workflow."""
     user_id: str
     query: str
-    context: Dict[str, Any]
-    retrieval: Dict[str, Any]
-    market: Dict[str, Any]
-    analysis: Dict[str, Any]
-    compliance: Dict[str, Any]
-    messages: List[Dict[str, Any]]
-    current_agent: Optional[str]
-    intent: Optional[str]
-    confidence: float
-    response: str
-    sources: List[Dict[str, Any]]
-    approved: bool
+    context: Dict[str, Any] = field(default_factory=dict)
+    retrieval: Dict[str, Any] = field(default_factory=dict)
+    market: Dict[str, Any] = field(default_factory=dict)
+    analysis: Dict[str, Any] = field(default_factory=dict)
+    compliance: Dict[str, Any] = field(default_factory=dict)
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+    current_agent: Optional[str] = None
+    intent: Optional[str] = None
+    confidence: float = 0.0
+    response: str = ""
+    sources: List[Dict[str, Any]] = field(default_factory=list)
+    approved: bool = False
 
 class FinnieWorkflow:
     """Main workflow class for the Finnie multi-agent system."""
@@ -91,193 +105,170 @@ class FinnieWorkflow:
     
     def _route_to_agent(self, state: FinnieState) -> str:
         """Determine which agent to route to based on the current agent."""
-        return state.get("current_agent", "tutor")
+        return state.current_agent or "tutor"
     
     def _router_node(self, state: FinnieState) -> FinnieState:
         """Route the query to the appropriate agent."""
         try:
             # Convert state to AgentState
             agent_state = AgentState(
-                user_id=state["user_id"],
-                query=state["query"],
-                context=state["context"],
-                retrieval=state["retrieval"],
-                market=state["market"],
-                analysis=state["analysis"],
-                compliance=state["compliance"],
-                messages=state["messages"]
+                user_id=state.user_id,
+                query=state.query,
+                context=state.context,
+                retrieval=state.retrieval,
+                market=state.market,
+                analysis=state.analysis,
+                compliance=state.compliance,
+                messages=state.messages
             )
             
             # Route the query
             agent_type = self.orchestrator.route_query(agent_state)
             
             # Update state with routing information
-            state["current_agent"] = agent_type.value
-            state["intent"] = agent_state.intent
-            state["confidence"] = agent_state.confidence
+            state.current_agent = agent_type.value
+            state.intent = agent_state.intent
+            state.confidence = agent_state.confidence
             
             logger.info(f"Routed query to {agent_type.value}")
             
         except Exception as e:
             logger.error(f"Error in router node: {str(e)}")
-            state["current_agent"] = "tutor"  # Default fallback
-            state["intent"] = "general"
-            state["confidence"] = 0.0
+            state.current_agent = "tutor"  # Default fallback
+            state.intent = "general"
+            state.confidence = 0.0
         
         return state
     
-    def _tutor_node(self, state: FinnieState) -> FinnieState:
+    async def _tutor_node(self, state: FinnieState) -> FinnieState:
         """Process query through tutor agent."""
-        if state["current_agent"] != "tutor":
+        if state.current_agent != "tutor":
             return state
         
-        # Ensure analysis dictionary exists
-        if "analysis" not in state:
-            state["analysis"] = {}
-        
         try:
             agent_state = AgentState(
-                user_id=state["user_id"],
-                query=state["query"],
-                context=state["context"],
-                retrieval=state["retrieval"],
-                market=state["market"],
-                analysis=state["analysis"],
-                compliance=state["compliance"],
-                messages=state["messages"]
+                user_id=state.user_id,
+                query=state.query,
+                context=state.context,
+                retrieval=state.retrieval,
+                market=state.market,
+                analysis=state.analysis,
+                compliance=state.compliance,
+                messages=state.messages
             )
             
-            result = self.tutor_agent.process(agent_state)
+            result = await asyncio.to_thread(self.tutor_agent.process, agent_state)
             
             # Update state with tutor response
-            state["analysis"]["response"] = result["response"]
-            state["sources"] = result.get("sources", [])
-            state["analysis"]["follow_up_questions"] = result.get("follow_up_questions", [])
-            state["analysis"]["concepts_covered"] = result.get("concepts_covered", [])
+            state.analysis["response"] = result["response"]
+            state.sources = result.get("sources", [])
+            state.analysis["follow_up_questions"] = result.get("follow_up_questions", [])
+            state.analysis["concepts_covered"] = result.get("concepts_covered", [])
             
         except Exception as e:
             logger.error(f"Error in tutor node: {str(e)}")
-            state["analysis"]["response"] = "I'm sorry, I encountered an error processing your educational request. Please try again."
-            state["sources"] = []
+            state.analysis["response"] = "I'm sorry, I encountered an error processing your educational request. Please try again."
+            state.sources = []
         
         return state
     
-    def _portfolio_node(self, state: FinnieState) -> FinnieState:
+    async def _portfolio_node(self, state: FinnieState) -> FinnieState:
         """Process query through portfolio agent."""
-        if state["current_agent"] != "portfolio":
+        if state.current_agent != "portfolio":
             return state
         
-        # Ensure analysis dictionary exists
-        if "analysis" not in state:
-            state["analysis"] = {}
-        
         try:
             agent_state = AgentState(
-                user_id=state["user_id"],
-                query=state["query"],
-                context=state["context"],
-                retrieval=state["retrieval"],
-                market=state["market"],
-                analysis=state["analysis"],
-                compliance=state["compliance"],
-                messages=state["messages"]
+                user_id=state.user_id,
+                query=state.query,
+                context=state.context,
+                retrieval=state.retrieval,
+                market=state.market,
+                analysis=state.analysis,
+                compliance=state.compliance,
+                messages=state.messages
             )
             
-            result = self.portfolio_agent.process(agent_state)
+            result = await asyncio.to_thread(self.portfolio_agent.process, agent_state)
             
             # Update state with portfolio response
-            state["analysis"]["response"] = result["response"]
-            state["sources"] = result.get("sources", [])
-            state["analysis"]["recommendations"] = result.get("recommendations", [])
-            state["analysis"]["metrics"] = result.get("metrics", {})
+            state.analysis["response"] = result["response"]
+            state.sources = result.get("sources", [])
+            state.analysis["recommendations"] = result.get("recommendations", [])
+            state.analysis["metrics"] = result.get("metrics", {})
             
         except Exception as e:
             logger.error(f"Error in portfolio node: {str(e)}")
-            state["analysis"]["response"] = "I'm sorry, I encountered an error analyzing your portfolio. Please try again."
-            state["sources"] = []
+            state.analysis["response"] = "I'm sorry, I encountered an error analyzing your portfolio. Please try again."
+            state.sources = []
         
         return state
     
-    def _market_node(self, state: FinnieState) -> FinnieState:
+    async def _market_node(self, state: FinnieState) -> FinnieState:
         """Process query through market agent."""
-        if state["current_agent"] != "market":
+        if state.current_agent != "market":
             return state
         
-        # Ensure analysis dictionary exists
-        if "analysis" not in state:
-            state["analysis"] = {}
-        
         try:
             agent_state = AgentState(
-                user_id=state["user_id"],
-                query=state["query"],
-                context=state["context"],
-                retrieval=state["retrieval"],
-                market=state["market"],
-                analysis=state["analysis"],
-                compliance=state["compliance"],
-                messages=state["messages"]
+                user_id=state.user_id,
+                query=state.query,
+                context=state.context,
+                retrieval=state.retrieval,
+                market=state.market,
+                analysis=state.analysis,
+                compliance=state.compliance,
+                messages=state.messages
             )
             
-            result = self.market_agent.process(agent_state)
+            result = await asyncio.to_thread(self.market_agent.process, agent_state)
             
             # Update state with market response
-            state["analysis"]["response"] = result["response"]
-            state["sources"] = result.get("sources", [])
-            state["market"] = result.get("market_data", {})
-            state["analysis"]["news"] = result.get("news", [])
+            state.analysis["response"] = result["response"]
+            state.sources = result.get("sources", [])
+            state.market = result.get("market_data", {})
+            state.analysis["news"] = result.get("news", [])
             
         except Exception as e:
             logger.error(f"Error in market node: {str(e)}")
-            state["analysis"]["response"] = "I'm sorry, I encountered an error retrieving market data. Please try again."
-            state["sources"] = []
+            state.analysis["response"] = "I'm sorry, I encountered an error retrieving market data. Please try again."
+            state.sources = []
         
         return state
     
-    def _compliance_node(self, state: FinnieState) -> FinnieState:
+    async def _compliance_node(self, state: FinnieState) -> FinnieState:
         """Process response through compliance agent."""
         try:
-            # Ensure analysis dictionary exists
-            if "analysis" not in state:
-                state["analysis"] = {}
-            
             # Get the response from analysis
-            response = state["analysis"].get("response", "")
-            agent_type = state["current_agent"] or "general"
+            response = state.analysis.get("response", "")
+            agent_type = state.current_agent or "general"
             
             # Validate through compliance agent
-            compliance_result = self.compliance_agent.validate_agent_response(
+            compliance_result = await self.compliance_agent.avalidate_agent_response(
                 {"response": response}, agent_type
             )
             
             # Update state with compliance results
-            state["compliance"] = compliance_result["compliance"]
-            state["analysis"]["response"] = compliance_result["response"]
-            state["approved"] = compliance_result["approved"]
+            state.compliance = compliance_result["compliance"]
+            state.analysis["response"] = compliance_result["response"]
+            state.approved = compliance_result["approved"]
             
         except Exception as e:
             logger.error(f"Error in compliance node: {str(e)}")
-            state["approved"] = False
-            state["compliance"] = {
+            state.approved = False
+            state.compliance = {
                 "disclaimers": ["This response has not been compliance reviewed."],
                 "risk_warnings": ["Please consult with a financial advisor before making investment decisions."]
             }
-            # Ensure analysis exists even on error
-            if "analysis" not in state:
-                state["analysis"] = {}
         
         return state
     
     def _responder_node(self, state: FinnieState) -> FinnieState:
         """Format the final response."""
         try:
-            # Ensure analysis dictionary exists
-            if "analysis" not in state:
-                state["analysis"] = {}
-            
-            response = state["analysis"].get("response", "")
-            sources = state.get("sources", [])
-            compliance = state.get("compliance", {})
+            response = state.analysis.get("response", "")
+            sources = state.sources
+            compliance = state.compliance
             
             # Add disclaimers to response
             if compliance.get("disclaimers"):
@@ -292,37 +283,38 @@ class FinnieWorkflow:
                 for warning in compliance["risk_warnings"]:
                     response += f"• {warning}\n"
             
-            state["response"] = response
+            state.response = response
             
         except Exception as e:
             logger.error(f"Error in responder node: {str(e)}")
-            state["response"] = "I'm sorry, I encountered an error formatting the response. Please try again."
+            state.response = "I'm sorry, I encountered an error formatting the response. Please try again."
         
         return state
     
     def process_query(self, user_id: str, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Process a user query through the complete workflow."""
+        return _run_sync(self.aprocess_query(user_id, query, context))
+    
+    def process_queries(self, user_id: str, queries: List[str], context: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Process several user queries concurrently."""
+        return _run_sync(self.aprocess_queries(user_id, queries, context))
+    
+    async def aprocess_queries(self, user_id: str, queries: List[str], context: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Fan out several queries so their agent and compliance calls overlap."""
+        return await asyncio.gather(*(self.aprocess_query(user_id, query, context) for query in queries))
+    
+    async def aprocess_query(self, user_id: str, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Process a user query through the complete workflow asynchronously."""
         try:
             # Initialize state
             initial_state = FinnieState(
                 user_id=user_id,
                 query=query,
-                context=context or {},
-                retrieval={},
-                market={},
-                analysis={},
-                compliance={},
-                messages=[],
-                current_agent=None,
-                intent=None,
-                confidence=0.0,
-                response="",
-                sources=[],
-                approved=False
+                context=context or {}
             )
             
             # Run the workflow
-            result = self.graph.invoke(initial_state)
+            result = await self.graph.ainvoke(initial_state)
             
             # Return the final result
             return {
@@ -2,26 +2,150 @@
 RAG Ingest Module - Processes and chunks educational content
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
 import os
+import mmap
+import multiprocessing
+import re
 import json
 import hashlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 import logging
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Simple keyword topics (in production, use NLP)
+_FINANCIAL_TOPICS = (
+    'portfolio', 'risk', 'return', 'diversification', 'volatility',
+    'sharpe ratio', 'beta', 'alpha', 'correlation', 'covariance',
+    'efficient frontier', 'capm', 'arbitrage', 'options', 'derivatives',
+    'bonds', 'stocks', 'etfs', 'mutual funds', 'rebalancing'
+)
+
+# Formats whose parsing is CPU-bound enough to be worth a process pool
+_CPU_BOUND_FORMATS = ('.pdf', '.html')
+
+# Whitespace-delimited tokens used for chunk windows
+_WORD_RE = re.compile(r'\S+')
+
+# Inputs above this size are hashed with BLAKE3's multithreaded backend
+_PARALLEL_HASH_THRESHOLD = 1 << 20
+
+def _write_json(path: Path, data: Any, indent: bool = False):
+    """Write UTF-8 JSON, using orjson when available."""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=option))
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2 if indent else None, ensure_ascii=False)
+
+def _read_json(path: Path) -> Any:
+    """Read a JSON file, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(Path(path).read_bytes())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+@contextmanager
+def _map_file(f):
+    """Read-only memory map of an open file; empty files (which mmap rejects) yield b''."""
+    if os.fstat(f.fileno()).st_size == 0:
+        yield b""
+        return
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield mm
+
+def _content_digest(data: bytes) -> str:
+    """Hash raw file bytes with BLAKE3 when available, otherwise BLAKE2b."""
+    if blake3 is None:
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+    max_threads = blake3.AUTO if len(data) > _PARALLEL_HASH_THRESHOLD else 1
+    return blake3(data, max_threads=max_threads).hexdigest(length=16)
+
+@lru_cache(maxsize=1)
+def _topic_automaton():
+    """Aho-Corasick automaton over the financial topics, built on first use."""
+    automaton = ahocorasick.Automaton()
+    for topic in _FINANCIAL_TOPICS:
+        automaton.add_word(topic, topic)
+    automaton.make_automaton()
+    return automaton
+
+def _extract_pdfium_page_range(pdf, start: int, stop: int) -> str:
+    """Extract text for pages [start, stop) of an open pypdfium2 document."""
+    texts = []
+    for page_index in range(start, stop):
+        page = pdf[page_index]
+        try:
+            textpage = page.get_textpage()
+            try:
+                texts.append(textpage.get_text_range() + "\n")
+            finally:
+                textpage.close()
+        finally:
+            page.close()
+    return "".join(texts)
+
+def _extract_pdf_file_page_range(file_path: str, start: int, stop: int) -> str:
+    """Process-pool worker: open a PDF and extract text for pages [start, stop)."""
+    import pypdfium2 as pdfium
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        return _extract_pdfium_page_range(pdf, start, stop)
+    finally:
+        pdf.close()
+
+def _ingest_file_in_worker(ingester: "ContentIngester", file_path: str) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Process-pool worker: ingest one file and return its chunks plus the cache entries it made."""
+    return ingester.ingest_file(file_path), ingester._cache_entries
+
 class ContentIngester:
     """Handles ingestion and processing of educational content."""
     
-    def __init__(self, chunk_size: int = 512, overlap: int = 100):
+    # PDF extraction tiers as (max_pages, mode, batch_size); None means no upper bound
+    PDF_STRATEGY_RULES = (
+        (500, "batch", 500),
+        (None, "process", 500),
+    )
+    
+    # Per-chunk fields; file-level metadata hangs off each chunk's shared "metadata" dict
+    CHUNK_FIELDS = ("chunk_id", "uid", "chunk_text", "chunk_length", "start_token", "end_token")
+    # Bump whenever chunk output changes so stale cache entries are not reused
+    CHUNK_FORMAT_VERSION = 3
+    
+    def __init__(self, chunk_size: int = 512, overlap: int = 100,
+                 cache_dir: Optional[str] = '.finnie_cache/chunks'):
         self.chunk_size = chunk_size
         self.overlap = overlap
         self.supported_formats = ['.md', '.txt', '.pdf', '.html']
+        # Content-addressed chunk cache; set cache_dir=None to disable the on-disk layer
+        self._cache_dir = Path(cache_dir) if cache_dir else None
+        self._cache_entries: Dict[str, Dict[str, Any]] = {}
     
-    def ingest_directory(self, directory_path: str) -> List[Dict[str, Any]]:
-        """Ingest all supported files from a directory."""
+    def ingest_directory(self, directory_path: str, max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Ingest all supported files from a directory, parsing files in parallel."""
         chunks = []
         directory = Path(directory_path)
         
@@ -29,17 +153,61 @@ class ContentIngester:
             logger.error(f"Directory {directory_path} does not exist")
             return chunks
         
-        for file_path in directory.rglob('*'):
-            if file_path.is_file() and file_path.suffix.lower() in self.supported_formats:
+        file_paths = [
+            file_path for file_path in directory.rglob('*')
+            if file_path.is_file() and file_path.suffix.lower() in self.supported_formats
+        ]
+        if not file_paths:
+            return chunks
+        
+        workers = min(max_workers or os.cpu_count() or 1, len(file_paths))
+        file_chunks_by_path = {}
+        if workers == 1:
+            # A single file (or worker) is not worth a pool
+            for file_path in file_paths:
                 try:
-                    file_chunks = self.ingest_file(str(file_path))
-                    chunks.extend(file_chunks)
-                    logger.info(f"Ingested {len(file_chunks)} chunks from {file_path}")
+                    file_chunks_by_path[file_path] = self.ingest_file(str(file_path))
+                    logger.info(f"Ingested {len(file_chunks_by_path[file_path])} chunks from {file_path}")
                 except Exception as e:
                     logger.error(f"Error ingesting {file_path}: {str(e)}")
+        else:
+            # Parsing PDF/HTML is CPU-bound, so fan those out across processes; text files
+            # only need their I/O overlapped, which threads do without process startup
+            use_processes = any(file_path.suffix.lower() in _CPU_BOUND_FORMATS for file_path in file_paths)
+            executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+            with executor_cls(max_workers=workers) as executor:
+                if use_processes:
+                    futures = {executor.submit(_ingest_file_in_worker, self, str(file_path)): file_path
+                               for file_path in file_paths}
+                else:
+                    futures = {executor.submit(self.ingest_file, str(file_path)): file_path
+                               for file_path in file_paths}
+                for future in as_completed(futures):
+                    file_path = futures[future]
+                    try:
+                        file_chunks = future.result()
+                        if use_processes:
+                            # Workers ran on a pickled copy, so merge their cache entries back in.
+                            # Identical files dispatched together are still parsed once per worker.
+                            file_chunks, cache_entries = file_chunks
+                            self._cache_entries.update(cache_entries)
+                        file_chunks_by_path[file_path] = file_chunks
+                        logger.info(f"Ingested {len(file_chunks)} chunks from {file_path}")
+                    except Exception as e:
+                        logger.error(f"Error ingesting {file_path}: {str(e)}")
+        
+        # Keep the output in directory order regardless of completion order
+        for file_path in file_paths:
+            chunks.extend(file_chunks_by_path.get(file_path, []))
         
         return chunks
     
+    def __getstate__(self):
+        """Pickle without the in-memory cache so pool tasks don't ship every cached entry."""
+        state = self.__dict__.copy()
+        state["_cache_entries"] = {}
+        return state
+    
     def ingest_file(self, file_path: str) -> List[Dict[str, Any]]:
         """Ingest a single file and return chunks."""
         file_path = Path(file_path)
@@ -48,26 +216,83 @@ class ContentIngester:
             logger.error(f"File {file_path} does not exist")
             return []
         
-        # Read file content
-        content = self._read_file(file_path)
-        if not content:
-            return []
+        # Map the file once: hash the mapped bytes and decode text formats straight from them
+        with open(file_path, 'rb') as f, _map_file(f) as data:
+            # Skip parsing and chunking when these exact bytes were ingested before
+            content_hash = _content_digest(data)
+            cache_key = self._cache_key(file_path, content_hash)
+            entry = self._get_cached_entry(cache_key)
+            
+            # Read file content
+            content = self._read_file(file_path, data) if entry is None else None
         
-        # Extract metadata
-        metadata = self._extract_metadata(file_path, content)
+        if entry is None:
+            if not content:
+                return []
+            
+            # Extract metadata
+            metadata = self._extract_metadata(file_path, content, content_hash)
+            
+            # Chunk the content
+            chunks = self._chunk_content(content, metadata)
+            
+            self._cache_entry(cache_key, {
+                "content": content,
+                "chunks": [{field: chunk[field] for field in self.CHUNK_FIELDS} for chunk in chunks]
+            })
+            return chunks
         
-        # Chunk the content
-        chunks = self._chunk_content(content, metadata)
+        # Path- and stat-derived metadata may differ for duplicates, so rebuild it
+        metadata = self._extract_metadata(file_path, entry["content"], content_hash)
+        return [{**chunk, "metadata": metadata} for chunk in entry["chunks"]]
+    
+    def _cache_key(self, file_path: Path, content_hash: str) -> str:
+        """Build a cache key from the content hash, file type and chunking parameters."""
+        return (f"{content_hash}-{file_path.suffix.lower().lstrip('.')}"
+                f"-{self.chunk_size}-{self.overlap}-v{self.CHUNK_FORMAT_VERSION}")
+    
+    def _get_cached_entry(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Look up cached content and chunks, in memory first and then on disk."""
+        entry = self._cache_entries.get(cache_key)
+        if entry is not None or self._cache_dir is None:
+            return entry
         
-        return chunks
+        cache_path = self._cache_dir / f"{cache_key}.json"
+        if not cache_path.exists():
+            return None
+        
+        try:
+            entry = _read_json(cache_path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable chunk cache {cache_path}: {str(e)}")
+            return None
+        
+        self._cache_entries[cache_key] = entry
+        return entry
     
-    def _read_file(self, file_path: Path) -> str:
-        """Read file content based on file type."""
+    def _cache_entry(self, cache_key: str, entry: Dict[str, Any]):
+        """Store an entry in memory and atomically write it to the on-disk cache."""
+        self._cache_entries[cache_key] = entry
+        if self._cache_dir is None:
+            return
+        
+        cache_path = self._cache_dir / f"{cache_key}.json"
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            _write_json(tmp_path, entry)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"Could not write chunk cache {cache_path}: {str(e)}")
+            tmp_path.unlink(missing_ok=True)
+    
+    def _read_file(self, file_path: Path, data: Optional[Union[bytes, mmap.mmap]] = None) -> str:
+        """Read file content based on file type; text formats decode ``data`` when given."""
         try:
             if file_path.suffix.lower() == '.md':
-                return file_path.read_text(encoding='utf-8')
+                return str(data, 'utf-8') if data is not None else file_path.read_text(encoding='utf-8')
             elif file_path.suffix.lower() == '.txt':
-                return file_path.read_text(encoding='utf-8')
+                return str(data, 'utf-8') if data is not None else file_path.read_text(encoding='utf-8')
             elif file_path.suffix.lower() == '.html':
                 return self._extract_text_from_html(file_path)
             elif file_path.suffix.lower() == '.pdf':
@@ -93,8 +318,45 @@ class ContentIngester:
             logger.error(f"Error extracting text from HTML {file_path}: {str(e)}")
             return ""
     
+    def _choose_pdf_strategy(self, page_count: int) -> Dict[str, Any]:
+        """Pick a PDF extraction strategy based on the document's page count."""
+        for max_pages, mode, batch_size in self.PDF_STRATEGY_RULES:
+            if max_pages is None or page_count <= max_pages:
+                return {"mode": mode, "batch_size": batch_size}
+    
     def _extract_text_from_pdf(self, file_path: Path) -> str:
         """Extract text content from PDF file."""
+        try:
+            import pypdfium2 as pdfium
+        except ImportError:
+            logger.debug("pypdfium2 not available, falling back to PyPDF2")
+            return self._extract_text_from_pdf_pypdf2(file_path)
+        
+        try:
+            pdf = pdfium.PdfDocument(str(file_path))
+            try:
+                page_count = len(pdf)
+                strategy = self._choose_pdf_strategy(page_count)
+                batch_size = strategy["batch_size"]
+                
+                # Read every page here for smaller documents, and inside pool workers
+                # (e.g. ingest_directory's), where a nested pool would oversubscribe the CPUs
+                if strategy["mode"] == "batch" or multiprocessing.parent_process() is not None:
+                    return _extract_pdfium_page_range(pdf, 0, page_count)
+            finally:
+                pdf.close()
+            
+            # Large documents: each worker opens the file and extracts its own page range
+            ranges = [(start, min(start + batch_size, page_count)) for start in range(0, page_count, batch_size)]
+            with ProcessPoolExecutor(max_workers=min(len(ranges), os.cpu_count() or 1)) as executor:
+                parts = executor.map(_extract_pdf_file_page_range, [str(file_path)] * len(ranges), *zip(*ranges))
+                return "".join(parts)
+        except Exception as e:
+            logger.error(f"Error extracting text from PDF {file_path}: {str(e)}")
+            return ""
+    
+    def _extract_text_from_pdf_pypdf2(self, file_path: Path) -> str:
+        """Extract text content from PDF file using PyPDF2."""
         try:
             import PyPDF2
             with open(file_path, 'rb') as f:
@@ -104,14 +366,14 @@ class ContentIngester:
                     text += page.extract_text() + "\n"
                 return text
         except ImportError:
-            logger.warning("PyPDF2 not available, cannot extract PDF text")
+            logger.warning("Neither pypdfium2 nor PyPDF2 available, cannot extract PDF text")
             return ""
         except Exception as e:
             logger.error(f"Error extracting text from PDF {file_path}: {str(e)}")
             return ""
     
-    def _extract_metadata(self, file_path: Path, content: str) -> Dict[str, Any]:
-        """Extract metadata from file."""
+    def _extract_metadata(self, file_path: Path, content: str, content_hash: Optional[str] = None) -> Dict[str, Any]:
+        """Extract metadata from file; content_hash is the digest of the raw file bytes."""
         metadata = {
             "file_path": str(file_path),
             "file_name": file_path.name,
@@ -119,7 +381,7 @@ class ContentIngester:
             "file_size": file_path.stat().st_size,
             "created_at": datetime.fromtimestamp(file_path.stat().st_ctime).isoformat(),
             "modified_at": datetime.fromtimestamp(file_path.stat().st_mtime).isoformat(),
-            "content_hash": hashlib.md5(content.encode()).hexdigest()
+            "content_hash": content_hash or _content_digest(content.encode('utf-8'))
         }
         
         # Extract title from content
@@ -127,13 +389,16 @@ class ContentIngester:
         if title:
             metadata["title"] = title
         
+        # Lowercase once for the keyword scans below
+        content_lower = content.lower()
+        
         # Extract level from file path or content
-        level = self._extract_level(file_path, content)
+        level = self._extract_level(file_path, content_lower)
         if level:
             metadata["level"] = level
         
         # Extract topics from content
-        topics = self._extract_topics(content)
+        topics = self._extract_topics(content_lower)
         if topics:
             metadata["topics"] = topics
         
@@ -141,10 +406,11 @@ class ContentIngester:
     
     def _extract_title(self, content: str, file_path: Path) -> Optional[str]:
         """Extract title from content."""
-        lines = content.split('\n')
+        # Only the first 10 lines are inspected, so don't split the whole document
+        lines = content.split('\n', 10)[:10]
         
         # Look for markdown title
-        for line in lines[:10]:  # Check first 10 lines
+        for line in lines:
             if line.startswith('# '):
                 return line[2:].strip()
             elif line.startswith('## '):
@@ -153,8 +419,8 @@ class ContentIngester:
         # Use filename as fallback
         return file_path.stem.replace('_', ' ').replace('-', ' ').title()
     
-    def _extract_level(self, file_path: Path, content: str) -> Optional[str]:
-        """Extract difficulty level from file path or content."""
+    def _extract_level(self, file_path: Path, content_lower: str) -> Optional[str]:
+        """Extract difficulty level from file path or lowercased content."""
         # Check file path for level indicators
         path_parts = str(file_path).lower().split('/')
         for part in path_parts:
@@ -162,7 +428,6 @@ class ContentIngester:
                 return part
         
         # Check content for level indicators
-        content_lower = content.lower()
         if 'beginner' in content_lower or 'basic' in content_lower:
             return 'beginner'
         elif 'intermediate' in content_lower or 'moderate' in content_lower:
@@ -172,90 +437,59 @@ class ContentIngester:
         
         return None
     
-    def _extract_topics(self, content: str) -> List[str]:
-        """Extract topics from content."""
-        # Simple keyword extraction (in production, use NLP)
-        financial_topics = [
-            'portfolio', 'risk', 'return', 'diversification', 'volatility',
-            'sharpe ratio', 'beta', 'alpha', 'correlation', 'covariance',
-            'efficient frontier', 'capm', 'arbitrage', 'options', 'derivatives',
-            'bonds', 'stocks', 'etfs', 'mutual funds', 'rebalancing'
-        ]
-        
-        topics = []
-        content_lower = content.lower()
-        
-        for topic in financial_topics:
-            if topic in content_lower:
-                topics.append(topic)
+    def _extract_topics(self, content_lower: str) -> List[str]:
+        """Extract topics from lowercased content."""
+        if ahocorasick is not None:
+            # Single pass over the content for all topics at once
+            found = {topic for _, topic in _topic_automaton().iter(content_lower)}
+            topics = [topic for topic in _FINANCIAL_TOPICS if topic in found]
+        else:
+            topics = [topic for topic in _FINANCIAL_TOPICS if topic in content_lower]
         
         return topics[:10]  # Limit to top 10 topics
     
     def _chunk_content(self, content: str, metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Chunk content into smaller pieces."""
+        """Chunk content into overlapping windows of chunk_size tokens."""
         chunks = []
         
-        # Split content into sentences
-        sentences = self._split_into_sentences(content)
+        # Token character spans, so chunk text is sliced from the original content
+        spans = np.array([m.span() for m in _WORD_RE.finditer(content)], dtype=np.int64).reshape(-1, 2)
+        num_tokens = len(spans)
+        if num_tokens == 0:
+            return chunks
         
-        # Create chunks with overlap
-        current_chunk = []
-        current_length = 0
+        # Window of chunk_size tokens; consecutive windows share at least `overlap` tokens
+        window = max(1, self.chunk_size)
+        max_stride = max(1, window - self.overlap)
         
-        for sentence in sentences:
-            sentence_length = len(sentence.split())
-            
-            # If adding this sentence would exceed chunk size, save current chunk
-            if current_length + sentence_length > self.chunk_size and current_chunk:
-                chunk_text = ' '.join(current_chunk)
-                chunk_metadata = metadata.copy()
-                chunk_metadata.update({
-                    "chunk_id": len(chunks),
-                    "chunk_text": chunk_text,
-                    "chunk_length": len(chunk_text.split()),
-                    "start_sentence": len(chunks) * (self.chunk_size - self.overlap),
-                    "end_sentence": len(chunks) * (self.chunk_size - self.overlap) + len(current_chunk)
-                })
-                chunks.append(chunk_metadata)
-                
-                # Start new chunk with overlap
-                overlap_sentences = current_chunk[-self.overlap:] if len(current_chunk) >= self.overlap else current_chunk
-                current_chunk = overlap_sentences + [sentence]
-                current_length = sum(len(s.split()) for s in current_chunk)
-            else:
-                current_chunk.append(sentence)
-                current_length += sentence_length
+        if num_tokens <= window:
+            starts = np.zeros(1, dtype=np.int64)
+        else:
+            # Spread the windows evenly over the document (stride <= max_stride) so
+            # the last window ends exactly on the final token instead of leaving a short tail
+            num_windows = -(-(num_tokens - window) // max_stride) + 1
+            starts = np.round(np.linspace(0, num_tokens - window, num_windows)).astype(np.int64)
+        ends = np.minimum(starts + window, num_tokens)
         
-        # Add final chunk
-        if current_chunk:
-            chunk_text = ' '.join(current_chunk)
-            chunk_metadata = metadata.copy()
-            chunk_metadata.update({
+        # File-level metadata is shared by reference rather than copied into every chunk
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            chunks.append({
                 "chunk_id": len(chunks),
-                "chunk_text": chunk_text,
-                "chunk_length": len(chunk_text.split()),
-                "start_sentence": len(chunks) * (self.chunk_size - self.overlap),
-                "end_sentence": len(chunks) * (self.chunk_size - self.overlap) + len(current_chunk)
+                # chunk_id restarts per file; the uid is stable across files and runs
+                "uid": f"{metadata['content_hash']}:{len(chunks)}",
+                "chunk_text": content[spans[start, 0]:spans[end - 1, 1]],
+                "chunk_length": end - start,
+                "start_token": start,
+                "end_token": end,
+                "metadata": metadata
             })
-            chunks.append(chunk_metadata)
         
         return chunks
     
-    def _split_into_sentences(self, text: str) -> List[str]:
-        """Split text into sentences."""
-        import re
-        
-        # Simple sentence splitting (in production, use spaCy or NLTK)
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        return sentences
-    
     def save_chunks(self, chunks: List[Dict[str, Any]], output_path: str):
         """Save chunks to a JSON file."""
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(chunks, f, indent=2, ensure_ascii=False)
+            _write_json(output_path, chunks, indent=True)
             logger.info(f"Saved {len(chunks)} chunks to {output_path}")
         except Exception as e:
             logger.error(f"Error saving chunks to {output_path}: {str(e)}")
@@ -263,8 +497,15 @@ class ContentIngester:
     def load_chunks(self, input_path: str) -> List[Dict[str, Any]]:
         """Load chunks from a JSON file."""
         try:
-            with open(input_path, 'r', encoding='utf-8') as f:
-                chunks = json.load(f)
+            chunks = _read_json(input_path)
+            
+            # JSON repeats each file's metadata per chunk; share one dict per file again
+            shared_metadata = {}
+            for chunk in chunks:
+                metadata = chunk.get("metadata")
+                if isinstance(metadata, dict):
+                    key = (metadata.get("file_path"), metadata.get("content_hash"))
+                    chunk["metadata"] = shared_metadata.setdefault(key, metadata)
             logger.info(f"Loaded {len(chunks)} chunks from {input_path}")
             return chunks
         except Exception as e:
@@ -2,14 +2,107 @@
 RAG Retrieve Module - Hybrid retrieval system with BM25 and vector search
 """
 
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
+import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
 from datetime import datetime
+from functools import lru_cache
 import logging
 from abc import ABC, abstractmethod
 
 logger = logging.getLogger(__name__)
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+_TOKEN_RE = re.compile(r'\b\w+\b')
+
+@lru_cache(maxsize=1024)
+def _tokenize_query(query: str) -> Tuple[str, ...]:
+    """Tokenize a query, memoised since the same queries recur across searches."""
+    return tuple(_TOKEN_RE.findall(query.lower()))
+
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores in descending order (ties keep index order)."""
+    k = min(k, scores.size)
+    if k <= 0:
+        return np.array([], dtype=np.intp)
+    
+    # O(N) partial selection, then sort only the k survivors
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.lexsort((top, -scores[top]))]
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _bm25_postings_kernel(qcols, idf, tf_data, tf_indices, tf_indptr, length_norm, k1, scores):
+        """Accumulate BM25 contributions by walking each query term's CSC postings."""
+        for q in range(qcols.shape[0]):
+            col = qcols[q]
+            weight = idf[col] * (k1 + 1)
+            for p in range(tf_indptr[col], tf_indptr[col + 1]):
+                tf = tf_data[p]
+                doc = tf_indices[p]
+                scores[doc] += weight * tf / (tf + length_norm[doc])
+else:
+    _bm25_postings_kernel = None
+
+def _filter_value(value: Any) -> Any:
+    """Hashable form of a metadata value (lists such as topics become tuples)."""
+    return tuple(value) if isinstance(value, list) else value
+
+class FilterIndex:
+    """Inverted index from metadata values to document positions, built lazily per key.
+    
+    Matches the original per-document filter semantics: documents without the key
+    pass, a list filter value means "any of", anything else means equality.
+    """
+    
+    def __init__(self, documents: List[Dict[str, Any]]):
+        self.documents = documents
+        self._postings: Dict[str, Tuple[Dict[Any, np.ndarray], np.ndarray]] = {}
+    
+    def _key_postings(self, key: str) -> Tuple[Dict[Any, np.ndarray], np.ndarray]:
+        """Positions per value of ``key``, plus positions of documents lacking it."""
+        if key not in self._postings:
+            by_value = defaultdict(list)
+            missing = []
+            for i, doc in enumerate(self.documents):
+                # File-level fields live in the chunk's shared metadata dict
+                metadata = doc.get('metadata') or {}
+                if key in doc:
+                    by_value[_filter_value(doc[key])].append(i)
+                elif key in metadata:
+                    by_value[_filter_value(metadata[key])].append(i)
+                else:
+                    missing.append(i)
+            self._postings[key] = (
+                {value: np.asarray(ids, dtype=np.intp) for value, ids in by_value.items()},
+                np.asarray(missing, dtype=np.intp),
+            )
+        return self._postings[key]
+    
+    def candidates(self, filters: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """Sorted positions of documents matching every filter."""
+        if not filters:
+            return np.arange(len(self.documents))
+        
+        candidates = None
+        for key, value in filters.items():
+            by_value, missing = self._key_postings(key)
+            wanted = value if isinstance(value, list) else [value]
+            postings = [by_value.get(_filter_value(v), missing[:0]) for v in wanted]
+            ids = np.unique(np.concatenate([missing, *postings]))
+            candidates = ids if candidates is None else np.intersect1d(candidates, ids, assume_unique=True)
+            if not candidates.size:
+                break
+        return candidates
+
 class Retriever(ABC):
     """Abstract base class for retrievers."""
     
@@ -25,163 +118,240 @@ class BM25Retriever(Retriever):
         self.documents = documents
         self.k1 = 1.2
         self.b = 0.75
+        self.filter_index = FilterIndex(documents)
         self._build_index()
     
     def _build_index(self):
-        """Build BM25 index."""
-        self.doc_freqs = {}
-        self.idf = {}
-        self.doc_len = []
-        self.avg_doc_len = 0
-        
-        # Collect all terms
-        all_terms = set()
-        for doc in self.documents:
-            terms = self._tokenize(doc.get('chunk_text', ''))
-            all_terms.update(terms)
-            self.doc_len.append(len(terms))
-        
-        self.avg_doc_len = np.mean(self.doc_len) if self.doc_len else 0
-        
-        # Calculate document frequencies
-        for doc_idx, doc in enumerate(self.documents):
-            terms = self._tokenize(doc.get('chunk_text', ''))
-            term_counts = {}
-            
-            for term in terms:
-                term_counts[term] = term_counts.get(term, 0) + 1
-                if term not in self.doc_freqs:
-                    self.doc_freqs[term] = 0
-                if term_counts[term] == 1:
-                    self.doc_freqs[term] += 1
-            
-            # Store term counts for this document
-            doc['term_counts'] = term_counts
+        """Build BM25 index as a sparse document-term matrix."""
+        texts = [doc.get('chunk_text', '') for doc in self.documents]
+        vectorizer = CountVectorizer(tokenizer=self._tokenize, lowercase=False, token_pattern=None)
+        
+        try:
+            # Term frequencies, shape (N_docs, V)
+            self.term_freqs = vectorizer.fit_transform(texts).tocsr()
+            self.vocabulary = vectorizer.vocabulary_
+        except ValueError:
+            # Empty corpus or no tokens at all
+            self.term_freqs = sparse.csr_matrix((len(texts), 0), dtype=np.int64)
+            self.vocabulary = {}
+        
+        self.doc_len = np.asarray(self.term_freqs.sum(axis=1)).ravel().astype(np.float64)
+        self.avg_doc_len = self.doc_len.mean() if self.doc_len.size else 0
+        
+        # Document-only part of the BM25 denominator, computed once
+        avg_doc_len = self.avg_doc_len if self.avg_doc_len > 0 else 1.0
+        self._length_norm = self.k1 * (1 - self.b + self.b * self.doc_len / avg_doc_len)
         
         # Calculate IDF
-        N = len(self.documents)
-        for term, df in self.doc_freqs.items():
-            self.idf[term] = np.log((N - df + 0.5) / (df + 0.5))
+        N = len(texts)
+        doc_freqs = np.bincount(self.term_freqs.indices, minlength=len(self.vocabulary))
+        self.idf = np.log((N - doc_freqs + 0.5) / (doc_freqs + 0.5))
+        
+        # Term-major postings: each query term touches only the documents containing it
+        self.postings = self.term_freqs.tocsc().astype(np.float64)
+        self.postings.sort_indices()
     
     def _tokenize(self, text: str) -> List[str]:
         """Simple tokenization."""
-        import re
-        return re.findall(r'\b\w+\b', text.lower())
+        return _TOKEN_RE.findall(text.lower())
     
     def search(self, query: str, k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Search using BM25."""
-        query_terms = self._tokenize(query)
-        scores = []
+        # Apply filters, then score only the surviving documents
+        candidates = self.filter_index.candidates(filters)
+        scores = self._bm25_scores(_tokenize_query(query), candidates)
         
-        for doc_idx, doc in enumerate(self.documents):
-            # Apply filters
-            if filters and not self._matches_filters(doc, filters):
-                continue
-            
-            score = self._bm25_score(query_terms, doc, doc_idx)
-            scores.append((score, doc))
-        
-        # Sort by score and return top k
-        scores.sort(key=lambda x: x[0], reverse=True)
-        return [doc for score, doc in scores[:k]]
-    
-    def _bm25_score(self, query_terms: List[str], doc: Dict[str, Any], doc_idx: int) -> float:
-        """Calculate BM25 score for a document."""
-        score = 0
-        term_counts = doc.get('term_counts', {})
-        doc_length = self.doc_len[doc_idx]
-        
-        for term in query_terms:
-            if term in term_counts:
-                tf = term_counts[term]
-                idf = self.idf.get(term, 0)
-                
-                # BM25 formula
-                numerator = tf * (self.k1 + 1)
-                denominator = tf + self.k1 * (1 - self.b + self.b * (doc_length / self.avg_doc_len))
-                
-                score += idf * (numerator / denominator)
-        
-        return score
-    
-    def _matches_filters(self, doc: Dict[str, Any], filters: Dict[str, Any]) -> bool:
-        """Check if document matches filters."""
-        for key, value in filters.items():
-            if key in doc:
-                if isinstance(value, list):
-                    if doc[key] not in value:
-                        return False
-                else:
-                    if doc[key] != value:
-                        return False
-        return True
-
+        results = []
+        for idx in _top_k_indices(scores, k):
+            doc = self.documents[candidates[idx]].copy()
+            doc['bm25_score'] = float(scores[idx])
+            results.append(doc)
+        
+        return results
+    
+    def _bm25_scores(self, query_terms: Sequence[str], rows: np.ndarray) -> np.ndarray:
+        """Calculate BM25 scores for the given document rows at once."""
+        cols = np.array([self.vocabulary[term] for term in query_terms if term in self.vocabulary], dtype=np.intp)
+        if not cols.size or not rows.size:
+            return np.zeros(rows.size)
+        
+        postings = self.postings
+        if _bm25_postings_kernel is not None:
+            scores = np.zeros(len(self.documents))
+            _bm25_postings_kernel(cols, self.idf, postings.data, postings.indices, postings.indptr,
+                                  self._length_norm, self.k1, scores)
+            return scores[rows]
+        
+        # BM25 formula over the concatenated postings of every query term
+        starts, stops = postings.indptr[cols], postings.indptr[cols + 1]
+        positions = np.concatenate([np.arange(start, stop) for start, stop in zip(starts, stops)])
+        docs = postings.indices[positions]
+        tf = postings.data[positions]
+        idf = np.repeat(self.idf[cols], stops - starts)
+        contributions = idf * (tf * (self.k1 + 1)) / (tf + self._length_norm[docs])
+        return np.bincount(docs, weights=contributions, minlength=len(self.documents))[rows]
+    
 class VectorRetriever(Retriever):
     """Vector-based retriever using embeddings."""
     
+    # Rows upcast to float32 per matmul block; keeps the temporary cache-resident
+    SCORE_BLOCK_ROWS = 4096
+    # Below this many documents an exhaustive scan beats building an ANN index
+    ANN_MIN_DOCS = 5000
+    # HNSW graph degree, and how many extra candidates to fetch to survive filtering
+    HNSW_M = 32
+    ANN_OVERSAMPLE = 4
+    
     def __init__(self, documents: List[Dict[str, Any]], embeddings: Optional[np.ndarray] = None):
         self.documents = documents
-        self.embeddings = embeddings
+        self.embeddings = None
+        self.index = None
         self.embedding_model = None
+        self.filter_index = FilterIndex(documents)
+        if embeddings is not None:
+            self.set_embeddings(embeddings)
     
     def set_embeddings(self, embeddings: np.ndarray):
-        """Set pre-computed embeddings."""
-        self.embeddings = embeddings
+        """Set pre-computed embeddings, stored L2-normalised as float16."""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        
+        # Normalise rows once so a dot product with the query ranks by cosine similarity
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.where(norms > 0, norms, 1.0)
+        
+        # Half precision halves memory and the bytes streamed per query
+        self.embeddings = np.ascontiguousarray(embeddings, dtype=np.float16)
+        self.index = self._build_ann_index(embeddings)
+    
+    def _build_ann_index(self, embeddings: np.ndarray):
+        """Build an HNSW index over normalised float32 embeddings for large corpora."""
+        if embeddings.shape[0] < self.ANN_MIN_DOCS:
+            return None
+        
+        try:
+            import faiss
+        except ImportError:
+            logger.warning("FAISS not available, using exhaustive vector search")
+            return None
+        
+        index = faiss.IndexHNSWFlat(embeddings.shape[1], self.HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.add(np.ascontiguousarray(embeddings, dtype=np.float32))
+        return index
     
     def set_embedding_model(self, model):
         """Set embedding model for computing embeddings."""
         self.embedding_model = model
     
-    def search(self, query: str, k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Search using vector similarity."""
+    def search(self, query: Union[str, List[str]], k: int = 10,
+               filters: Optional[Dict[str, Any]] = None) -> Union[List[Dict[str, Any]], List[List[Dict[str, Any]]]]:
+        """Search using vector similarity; a list of queries returns one result list per query."""
+        if isinstance(query, str):
+            return self._search_batch([query], k, filters)[0]
+        return self._search_batch(list(query), k, filters)
+    
+    def _search_batch(self, queries: List[str], k: int,
+                      filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """Encode all queries in one call and rank each against the stored embeddings."""
         if self.embeddings is None:
             logger.warning("No embeddings available for vector search")
-            return []
-        
-        # Get query embedding
-        query_embedding = self._get_query_embedding(query)
-        if query_embedding is None:
-            return []
+            return [[] for _ in queries]
         
-        # Calculate similarities
-        similarities = np.dot(self.embeddings, query_embedding)
+        # Get query embeddings
+        query_embeddings = self._get_query_embeddings(queries)
+        if query_embeddings is None:
+            return [[] for _ in queries]
         
-        # Apply filters and get top k
-        filtered_indices = []
-        for i, doc in enumerate(self.documents):
-            if not filters or self._matches_filters(doc, filters):
-                filtered_indices.append(i)
+        # Approximate search first; fall back to a full scan if filters leave too few hits
+        filtered_indices = self.filter_index.candidates(filters)
+        results: List[Optional[List[Dict[str, Any]]]] = [None] * len(queries)
+        if self.index is not None:
+            results = self._ann_search(query_embeddings, k, filtered_indices if filters else None)
         
-        if not filtered_indices:
-            return []
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
         
-        # Get similarities for filtered documents
-        filtered_similarities = similarities[filtered_indices]
+        if not filtered_indices.size:
+            for i in pending:
+                results[i] = []
+            return results
         
-        # Get top k indices
-        top_k_indices = np.argsort(filtered_similarities)[::-1][:k]
+        # Similarities for the pending queries, one column per query
+        similarities = self._similarities(query_embeddings[pending])[filtered_indices]
         
-        # Return documents with scores
-        results = []
-        for idx in top_k_indices:
-            doc_idx = filtered_indices[idx]
-            doc = self.documents[doc_idx].copy()
-            doc['similarity_score'] = float(filtered_similarities[idx])
-            results.append(doc)
+        for column, query_idx in enumerate(pending):
+            filtered_similarities = similarities[:, column]
+            top_k_indices = _top_k_indices(filtered_similarities, k)
+            
+            # Return documents with scores
+            query_results = []
+            for idx in top_k_indices:
+                doc_idx = filtered_indices[idx]
+                doc = self.documents[doc_idx].copy()
+                doc['similarity_score'] = float(filtered_similarities[idx])
+                query_results.append(doc)
+            results[query_idx] = query_results
         
         return results
     
-    def _get_query_embedding(self, query: str) -> Optional[np.ndarray]:
-        """Get embedding for query."""
+    def _ann_search(self, query_embeddings: np.ndarray, k: int,
+                    allowed_indices: Optional[np.ndarray] = None) -> List[Optional[List[Dict[str, Any]]]]:
+        """Search the HNSW index; a query gets None when filtering leaves fewer than k hits."""
+        queries = np.ascontiguousarray(query_embeddings, dtype=np.float32)
+        n_candidates = min(k * self.ANN_OVERSAMPLE, len(self.documents))
+        scores, indices = self.index.search(queries, n_candidates)
+        
+        allowed = None
+        n_expected = min(k, len(self.documents))
+        if allowed_indices is not None:
+            allowed = np.zeros(len(self.documents), dtype=bool)
+            allowed[allowed_indices] = True
+            n_expected = min(k, allowed_indices.size)
+        
+        batch_results = []
+        for query_scores, query_indices in zip(scores, indices):
+            results = []
+            for score, doc_idx in zip(query_scores, query_indices):
+                # FAISS pads with -1 when it finds fewer neighbours than requested
+                if doc_idx < 0:
+                    continue
+                if allowed is not None and not allowed[doc_idx]:
+                    continue
+                doc = self.documents[doc_idx].copy()
+                doc['similarity_score'] = float(score)
+                results.append(doc)
+                if len(results) == k:
+                    break
+            batch_results.append(results if len(results) == n_expected else None)
+        
+        return batch_results
+    
+    def _similarities(self, query_embeddings: np.ndarray) -> np.ndarray:
+        """(N, B) dot products of every stored embedding with each query, in float32."""
+        query_matrix = np.asarray(query_embeddings, dtype=np.float32).T
+        similarities = np.empty((self.embeddings.shape[0], query_matrix.shape[1]), dtype=np.float32)
+        
+        # BLAS has no float16 kernels, so upcast block by block rather than the whole matrix
+        for start in range(0, self.embeddings.shape[0], self.SCORE_BLOCK_ROWS):
+            stop = start + self.SCORE_BLOCK_ROWS
+            np.matmul(self.embeddings[start:stop].astype(np.float32), query_matrix, out=similarities[start:stop])
+        
+        return similarities
+    
+    def _get_query_embeddings(self, queries: List[str]) -> Optional[np.ndarray]:
+        """Get a (B, D) matrix of query embeddings from a single batched encode."""
         if self.embedding_model is None:
             # Use simple TF-IDF as fallback
-            return self._tfidf_embedding(query)
+            return np.stack([self._tfidf_embedding(query) for query in queries])
         
         try:
-            # Use the embedding model
-            return self.embedding_model.encode(query)
+            # One encode call amortises tokenizer and device launch overhead across the batch
+            embeddings = self.embedding_model.encode(
+                queries, batch_size=32, convert_to_numpy=True, normalize_embeddings=True
+            )
+            return np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
         except Exception as e:
-            logger.error(f"Error getting query embedding: {str(e)}")
+            logger.error(f"Error getting query embeddings: {str(e)}")
             return None
     
     def _tfidf_embedding(self, query: str) -> Optional[np.ndarray]:
@@ -190,18 +360,6 @@ class VectorRetriever(Retriever):
         # In production, use proper TF-IDF vectorizer
         return np.random.random(384)  # Mock embedding
     
-    def _matches_filters(self, doc: Dict[str, Any], filters: Dict[str, Any]) -> bool:
-        """Check if document matches filters."""
-        for key, value in filters.items():
-            if key in doc:
-                if isinstance(value, list):
-                    if doc[key] not in value:
-                        return False
-                else:
-                    if doc[key] != value:
-                        return False
-        return True
-
 class HybridRetriever(Retriever):
     """Hybrid retriever combining BM25 and vector search."""
     
@@ -209,6 +367,10 @@ class HybridRetriever(Retriever):
         self.bm25_retriever = BM25Retriever(documents)
         self.vector_retriever = VectorRetriever(documents, embeddings)
         self.documents = documents
+        # Both retrievers see the same documents, so share one filter index
+        self.vector_retriever.filter_index = self.bm25_retriever.filter_index
+        # BM25 and vector search are independent; reuse two workers across queries
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hybrid-search")
     
     def set_embeddings(self, embeddings: np.ndarray):
         """Set embeddings for vector retriever."""
@@ -220,9 +382,10 @@ class HybridRetriever(Retriever):
     
     def search(self, query: str, k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Search using hybrid approach."""
-        # Get results from both retrievers
-        bm25_results = self.bm25_retriever.search(query, k * 2, filters)
-        vector_results = self.vector_retriever.search(query, k * 2, filters)
+        # Get results from both retrievers concurrently; the BLAS matmul releases the GIL
+        bm25_future = self._executor.submit(self.bm25_retriever.search, query, k * 2, filters)
+        vector_future = self._executor.submit(self.vector_retriever.search, query, k * 2, filters)
+        bm25_results, vector_results = bm25_future.result(), vector_future.result()
         
         # Combine and deduplicate results
         combined_results = self._combine_results(bm25_results, vector_results, query)
@@ -232,6 +395,13 @@ class HybridRetriever(Retriever):
         
         return reranked_results[:k]
     
+    @staticmethod
+    def _doc_key(doc: Dict[str, Any]) -> Any:
+        """De-duplication key: the chunk uid when present (chunk_id repeats across files)."""
+        if 'uid' in doc:
+            return doc['uid']
+        return doc.get('chunk_id', id(doc))
+    
     def _combine_results(self, bm25_results: List[Dict[str, Any]], 
                         vector_results: List[Dict[str, Any]], 
                         query: str) -> List[Dict[str, Any]]:
@@ -241,7 +411,7 @@ class HybridRetriever(Retriever):
         
         # Add BM25 results
         for doc in bm25_results:
-            doc_id = doc.get('chunk_id', id(doc))
+            doc_id = self._doc_key(doc)
             if doc_id not in unique_results:
                 doc['bm25_score'] = doc.get('bm25_score', 0)
                 doc['vector_score'] = 0
@@ -249,7 +419,7 @@ class HybridRetriever(Retriever):
         
         # Add vector results
         for doc in vector_results:
-            doc_id = doc.get('chunk_id', id(doc))
+            doc_id = self._doc_key(doc)
             if doc_id in unique_results:
                 unique_results[doc_id]['vector_score'] = doc.get('similarity_score', 0)
             else:
@@ -261,6 +431,8 @@ class HybridRetriever(Retriever):
     
     def _rerank_results(self, results: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
         """Rerank results using a combination of scores."""
+        query_terms = set(query.lower().split())
+        
         for doc in results:
             bm25_score = doc.get('bm25_score', 0)
             vector_score = doc.get('vector_score', 0)
@@ -269,7 +441,6 @@ class HybridRetriever(Retriever):
             combined_score = 0.6 * bm25_score + 0.4 * vector_score
             
             # Add query relevance bonus
-            query_terms = set(query.lower().split())
             doc_terms = set(doc.get('chunk_text', '').lower().split())
             overlap = len(query_terms.intersection(doc_terms))
             relevance_bonus = overlap / len(query_terms) if query_terms else 0
@@ -292,7 +463,9 @@ class RAGSystem:
     def search(self, query: str, k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Search for relevant documents."""
         try:
-            results = self.retriever.search(query, k, filters)
+            # Flatten the shared file-level metadata into each returned chunk
+            results = [{**result.get('metadata', {}), **result}
+                       for result in self.retriever.search(query, k, filters)]
             
             # Add attribution information
             for result in results:
@@ -9,46 +9,198 @@ Developed by Sankar Subbayya
 import pandas as pd
 import numpy as np
 from datetime import datetime
+import operator
 import os
+import sys
 
-def load_portfolio_data(csv_file="data/portfolio_analysis.csv"):
-    """Load portfolio data from CSV file"""
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# Numeric columns of portfolio_analysis.csv; float32 is ample for prices and ratios
+FLOAT_COLUMNS = (
+    "quantity", "purchase_price", "current_price", "market_value", "cost_basis",
+    "gain_loss", "gain_loss_pct", "beta", "volatility_1y", "sharpe_ratio", "max_drawdown"
+)
+
+# Per-holding risk metrics averaged by market value
+RISK_COLUMNS = ["beta", "volatility_1y", "sharpe_ratio", "max_drawdown"]
+
+# Files larger than this are analyzed in streamed chunks rather than loaded whole
+STREAMING_THRESHOLD_BYTES = 256 * 1024 * 1024
+STREAMING_CHUNKSIZE = 100_000
+
+# Recommendation rules as (context value, comparison, threshold, message), checked in order;
+# messages may reference any context value
+RECOMMENDATION_RULES = (
+    # Diversification
+    ("top_5_concentration", operator.gt, 50, "⚠️ High concentration in top 5 holdings - consider diversifying"),
+    ("max_sector_weight", operator.gt, 30, "⚠️ High concentration in {top_sector} sector ({max_sector_weight:.1f}%)"),
+    ("stock_weight", operator.gt, 70, "💡 Consider adding more bonds and alternative investments"),
+    # Performance
+    ("total_gain_loss_pct", operator.lt, 5, "📈 Portfolio underperforming - review individual holdings"),
+    # Risk
+    ("weighted_beta", operator.gt, 1.2, "⚠️ High beta portfolio - consider adding defensive assets"),
+    ("weighted_volatility", operator.gt, 0.25, "📉 High volatility - consider reducing risk"),
+)
+
+def _allocation_by(df, key):
+    """Total market value and gain/loss plus mean return per group, rounded to cents"""
+    
+    columns = [key, "market_value", "gain_loss", "gain_loss_pct"]
+    if pl is not None:
+        # Multi-threaded hash group-by over Arrow columns
+        grouped = (
+            pl.DataFrame({column: df[column].to_numpy() for column in columns})
+            .group_by(key)
+            .agg(pl.col("market_value").sum(), pl.col("gain_loss").sum(), pl.col("gain_loss_pct").mean())
+        )
+        grouped = pd.DataFrame(grouped.to_dict(as_series=False)).set_index(key)
+    else:
+        # Results are re-sorted by market value, so skip sorting the group keys
+        grouped = df[columns].groupby(key, observed=True, sort=False).agg(
+            market_value=("market_value", "sum"),
+            gain_loss=("gain_loss", "sum"),
+            gain_loss_pct=("gain_loss_pct", "mean")
+        )
+    
+    return grouped.round(2)
+
+def load_portfolio_data(csv_file="data/portfolio_analysis.csv", chunksize=None):
+    """Load portfolio data from CSV file
+    
+    With ``chunksize`` set, returns an iterator of DataFrames of that many rows
+    instead of reading the whole file at once.
+    """
     
     if not os.path.exists(csv_file):
         print(f"❌ File {csv_file} not found!")
         return None
     
-    df = pd.read_csv(csv_file)
+    if chunksize:
+        # The pyarrow engine cannot stream, so chunked reads use the C engine; columns stay
+        # float64 because running sums across many chunks would drift in float32
+        print(f"✅ Streaming portfolio data from {csv_file} in chunks of {chunksize:,} rows")
+        return pd.read_csv(csv_file, chunksize=chunksize)
+    
+    try:
+        # Multi-threaded Arrow parser with the numeric columns typed up front
+        df = pd.read_csv(csv_file, engine="pyarrow", dtype_backend="pyarrow",
+                         dtype={column: "float32[pyarrow]" for column in FLOAT_COLUMNS})
+    except ImportError:
+        # pyarrow not installed - fall back to the default C engine
+        df = pd.read_csv(csv_file, dtype={column: "float32" for column in FLOAT_COLUMNS})
+    
+    # Low-cardinality group keys; groupby then works on integer codes instead of hashing strings
+    df = df.astype({"sector": "category", "asset_type": "category"})
     print(f"✅ Loaded portfolio data from {csv_file}")
     print(f"📊 Found {len(df)} holdings")
     
     return df
 
+def _weighted_risk_sums(market_value, metrics):
+    """Market-value-weighted sums of the RISK_COLUMNS metrics, skipping missing values like pandas
+    
+    A missing metric or market value drops only that holding's term rather than turning
+    the whole weighted sum into NaN.
+    """
+    return np.nansum(market_value[:, None] * metrics, axis=0)
+
+def _largest_rows(df, column, k):
+    """The k rows with the largest values in ``column``, largest first
+    
+    argpartition selects them in O(N); only the k winners are sorted.
+    """
+    
+    values = df[column].to_numpy(dtype=float)
+    k = min(k, len(values))
+    if k == 0:
+        return df.iloc[:0]
+    
+    top = np.argpartition(-values, k - 1)[:k]
+    return df.iloc[top[np.argsort(-values[top], kind="stable")]]
+
+def _finish_allocation(grouped, total_value):
+    """Add portfolio weights to a per-group allocation and sort by market value"""
+    
+    grouped["weight_pct"] = (grouped["market_value"] * (100.0 / total_value)).round(2)
+    return grouped.sort_values("market_value", ascending=False)
+
+def _print_section(title, lines):
+    """Print a titled report section with a single write"""
+    
+    print("\n".join([f"\n{title}", "=" * 50, *lines]))
+
+def _print_performance(performance_metrics):
+    """Print the performance section"""
+    
+    best_performer = performance_metrics["best_performer"]
+    worst_performer = performance_metrics["worst_performer"]
+    _print_section("📈 PORTFOLIO PERFORMANCE ANALYSIS", [
+        f"💰 Total Market Value: ${performance_metrics['total_market_value']:,.2f}",
+        f"💸 Total Cost Basis: ${performance_metrics['total_cost_basis']:,.2f}",
+        f"📊 Total Gain/Loss: ${performance_metrics['total_gain_loss']:,.2f}",
+        f"📈 Total Return: {performance_metrics['total_gain_loss_pct']:.2f}%",
+        "",
+        f"🏆 Best Performer: {best_performer['symbol']} ({best_performer['gain_loss_pct']:.2f}%)",
+        f"📉 Worst Performer: {worst_performer['symbol']} ({worst_performer['gain_loss_pct']:.2f}%)"
+    ])
+
+def _print_sector_allocation(sector_analysis):
+    """Print the sector allocation section"""
+    
+    _print_section("🏢 SECTOR ALLOCATION ANALYSIS", [
+        "Sector Distribution:",
+        *(f"  {sector:20} {weight:6.2f}% ${value:10,.2f}"
+          for sector, weight, value in zip(sector_analysis.index.to_numpy(),
+                                           sector_analysis["weight_pct"].to_numpy(),
+                                           sector_analysis["market_value"].to_numpy()))
+    ])
+
+def _print_asset_type_allocation(asset_analysis):
+    """Print the asset type allocation section"""
+    
+    _print_section("🎯 ASSET TYPE ALLOCATION ANALYSIS", [
+        "Asset Type Distribution:",
+        *(f"  {asset_type:15} {weight:6.2f}% ${value:10,.2f}"
+          for asset_type, weight, value in zip(asset_analysis.index.to_numpy(),
+                                               asset_analysis["weight_pct"].to_numpy(),
+                                               asset_analysis["market_value"].to_numpy()))
+    ])
+
+def _print_risk_metrics(risk_metrics, top_5_holdings, total_value):
+    """Print the risk section"""
+    
+    market_value = top_5_holdings["market_value"].to_numpy(dtype=float)
+    weights = market_value / total_value * 100
+    _print_section("⚠️ RISK ANALYSIS", [
+        f"📊 Weighted Average Beta: {risk_metrics['weighted_beta']:.2f}",
+        f"📈 Weighted Average Volatility: {risk_metrics['weighted_volatility']:.2f}",
+        f"⚖️ Weighted Average Sharpe Ratio: {risk_metrics['weighted_sharpe']:.2f}",
+        f"📉 Weighted Average Max Drawdown: {risk_metrics['weighted_max_drawdown']:.2f}",
+        "",
+        f"🎯 Top 5 Holdings Concentration: {risk_metrics['top_5_concentration']:.2f}%",
+        "Top 5 Holdings:",
+        *(f"  {symbol:8} {weight:6.2f}% ${value:10,.2f}"
+          for symbol, weight, value in zip(top_5_holdings["symbol"].to_numpy(), weights, market_value))
+    ])
+
 def analyze_portfolio_performance(df):
     """Analyze portfolio performance metrics"""
     
-    print("\n📈 PORTFOLIO PERFORMANCE ANALYSIS")
-    print("=" * 50)
+    # Pull the numeric columns out once as a single (N, 4) array
+    values = df[["market_value", "cost_basis", "gain_loss", "gain_loss_pct"]].to_numpy(dtype=float)
     
     # Basic metrics
-    total_market_value = df["market_value"].sum()
-    total_cost_basis = df["cost_basis"].sum()
-    total_gain_loss = df["gain_loss"].sum()
+    total_market_value, total_cost_basis, total_gain_loss = np.nansum(values[:, :3], axis=0)
     total_gain_loss_pct = (total_gain_loss / total_cost_basis) * 100
     
-    print(f"💰 Total Market Value: ${total_market_value:,.2f}")
-    print(f"💸 Total Cost Basis: ${total_cost_basis:,.2f}")
-    print(f"📊 Total Gain/Loss: ${total_gain_loss:,.2f}")
-    print(f"📈 Total Return: {total_gain_loss_pct:.2f}%")
-    
     # Best and worst performers
-    best_performer = df.loc[df["gain_loss_pct"].idxmax()]
-    worst_performer = df.loc[df["gain_loss_pct"].idxmin()]
+    best_performer = df.iloc[int(np.nanargmax(values[:, 3]))]
+    worst_performer = df.iloc[int(np.nanargmin(values[:, 3]))]
     
-    print(f"\n🏆 Best Performer: {best_performer['symbol']} ({best_performer['gain_loss_pct']:.2f}%)")
-    print(f"📉 Worst Performer: {worst_performer['symbol']} ({worst_performer['gain_loss_pct']:.2f}%)")
-    
-    return {
+    performance_metrics = {
         "total_market_value": total_market_value,
         "total_cost_basis": total_cost_basis,
         "total_gain_loss": total_gain_loss,
@@ -56,159 +208,204 @@ def analyze_portfolio_performance(df):
         "best_performer": best_performer,
         "worst_performer": worst_performer
     }
-
-def analyze_sector_allocation(df):
-    """Analyze sector allocation"""
-    
-    print("\n🏢 SECTOR ALLOCATION ANALYSIS")
-    print("=" * 50)
-    
-    sector_analysis = df.groupby("sector").agg({
-        "market_value": "sum",
-        "gain_loss": "sum",
-        "gain_loss_pct": "mean"
-    }).round(2)
+    _print_performance(performance_metrics)
     
-    total_value = df["market_value"].sum()
-    sector_analysis["weight_pct"] = (sector_analysis["market_value"] / total_value * 100).round(2)
-    
-    # Sort by market value
-    sector_analysis = sector_analysis.sort_values("market_value", ascending=False)
+    return performance_metrics
+
+def analyze_sector_allocation(df, total_value=None):
+    """Analyze sector allocation; pass ``total_value`` to reuse an existing market value total"""
     
-    print("Sector Distribution:")
-    for sector, data in sector_analysis.iterrows():
-        print(f"  {sector:20} {data['weight_pct']:6.2f}% ${data['market_value']:10,.2f}")
+    if total_value is None:
+        total_value = df["market_value"].sum()
+    sector_analysis = _finish_allocation(_allocation_by(df, "sector"), total_value)
+    _print_sector_allocation(sector_analysis)
     
     return sector_analysis
 
-def analyze_asset_type_allocation(df):
-    """Analyze asset type allocation"""
-    
-    print("\n🎯 ASSET TYPE ALLOCATION ANALYSIS")
-    print("=" * 50)
+def analyze_asset_type_allocation(df, total_value=None):
+    """Analyze asset type allocation; pass ``total_value`` to reuse an existing market value total"""
     
-    asset_analysis = df.groupby("asset_type").agg({
-        "market_value": "sum",
-        "gain_loss": "sum",
-        "gain_loss_pct": "mean"
-    }).round(2)
-    
-    total_value = df["market_value"].sum()
-    asset_analysis["weight_pct"] = (asset_analysis["market_value"] / total_value * 100).round(2)
-    
-    # Sort by market value
-    asset_analysis = asset_analysis.sort_values("market_value", ascending=False)
-    
-    print("Asset Type Distribution:")
-    for asset_type, data in asset_analysis.iterrows():
-        print(f"  {asset_type:15} {data['weight_pct']:6.2f}% ${data['market_value']:10,.2f}")
+    if total_value is None:
+        total_value = df["market_value"].sum()
+    asset_analysis = _finish_allocation(_allocation_by(df, "asset_type"), total_value)
+    _print_asset_type_allocation(asset_analysis)
     
     return asset_analysis
 
-def analyze_risk_metrics(df):
-    """Analyze risk metrics"""
-    
-    print("\n⚠️ RISK ANALYSIS")
-    print("=" * 50)
+def analyze_risk_metrics(df, total_value=None):
+    """Analyze risk metrics; pass ``total_value`` to reuse an existing market value total"""
     
     # Calculate portfolio-level risk metrics
-    total_value = df["market_value"].sum()
+    market_value = df["market_value"].to_numpy(dtype=float)
+    if total_value is None:
+        total_value = np.nansum(market_value)
     
-    # Weighted average metrics
-    weighted_beta = (df["beta"] * df["market_value"]).sum() / total_value
-    weighted_volatility = (df["volatility_1y"] * df["market_value"]).sum() / total_value
-    weighted_sharpe = (df["sharpe_ratio"] * df["market_value"]).sum() / total_value
-    weighted_max_drawdown = (df["max_drawdown"] * df["market_value"]).sum() / total_value
-    
-    print(f"📊 Weighted Average Beta: {weighted_beta:.2f}")
-    print(f"📈 Weighted Average Volatility: {weighted_volatility:.2f}")
-    print(f"⚖️ Weighted Average Sharpe Ratio: {weighted_sharpe:.2f}")
-    print(f"📉 Weighted Average Max Drawdown: {weighted_max_drawdown:.2f}")
+    # Weighted average metrics, all four in a single vectorized reduction
+    metrics = df[RISK_COLUMNS].to_numpy(dtype=float)
+    weighted_beta, weighted_volatility, weighted_sharpe, weighted_max_drawdown = (
+        _weighted_risk_sums(market_value, metrics) / total_value
+    )
     
     # Risk concentration
-    top_5_holdings = df.nlargest(5, "market_value")
+    top_5_holdings = _largest_rows(df, "market_value", 5)
     top_5_concentration = (top_5_holdings["market_value"].sum() / total_value) * 100
     
-    print(f"\n🎯 Top 5 Holdings Concentration: {top_5_concentration:.2f}%")
-    print("Top 5 Holdings:")
-    for _, holding in top_5_holdings.iterrows():
-        weight = (holding["market_value"] / total_value) * 100
-        print(f"  {holding['symbol']:8} {weight:6.2f}% ${holding['market_value']:10,.2f}")
-    
-    return {
+    risk_metrics = {
         "weighted_beta": weighted_beta,
         "weighted_volatility": weighted_volatility,
         "weighted_sharpe": weighted_sharpe,
         "weighted_max_drawdown": weighted_max_drawdown,
         "top_5_concentration": top_5_concentration
     }
-
-def generate_recommendations(df, performance_metrics, sector_analysis, asset_analysis, risk_metrics):
-    """Generate portfolio recommendations"""
-    
-    print("\n💡 PORTFOLIO RECOMMENDATIONS")
-    print("=" * 50)
+    _print_risk_metrics(risk_metrics, top_5_holdings, total_value)
     
-    recommendations = []
+    return risk_metrics
+
+def analyze_portfolio_chunks(chunks):
+    """Run the performance, allocation and risk analyses over DataFrame chunks
+    
+    Every statistic is kept as a running aggregate, so memory stays bounded by the
+    chunk size. Returns the same (performance, sector, asset type, risk) results as
+    the per-DataFrame analyses.
+    """
+    
+    totals = np.zeros(3)
+    weighted_sums = np.zeros(len(RISK_COLUMNS))
+    group_sums = {"sector": None, "asset_type": None}
+    top_5_holdings = best_performer = worst_performer = None
+    
+    for chunk in chunks:
+        market_value = chunk["market_value"].to_numpy(dtype=float)
+        totals += np.nansum(chunk[["market_value", "cost_basis", "gain_loss"]].to_numpy(dtype=float), axis=0)
+        weighted_sums += _weighted_risk_sums(market_value, chunk[RISK_COLUMNS].to_numpy(dtype=float))
+        
+        # Group sums and counts merge across chunks; means are taken at the end
+        for key, running in group_sums.items():
+            partial = chunk.groupby(key, sort=False).agg(
+                market_value=("market_value", "sum"),
+                gain_loss=("gain_loss", "sum"),
+                gain_loss_pct_sum=("gain_loss_pct", "sum"),
+                count=("gain_loss_pct", "count")
+            )
+            group_sums[key] = partial if running is None else running.add(partial, fill_value=0)
+        
+        # Only the five largest holdings seen so far are carried forward
+        candidates = chunk if top_5_holdings is None else pd.concat([top_5_holdings, chunk])
+        top_5_holdings = _largest_rows(candidates, "market_value", 5)
+        
+        gain_loss_pct = chunk["gain_loss_pct"].to_numpy(dtype=float)
+        if np.isnan(gain_loss_pct).all():
+            continue
+        best = chunk.iloc[int(np.nanargmax(gain_loss_pct))]
+        worst = chunk.iloc[int(np.nanargmin(gain_loss_pct))]
+        if best_performer is None or best["gain_loss_pct"] > best_performer["gain_loss_pct"]:
+            best_performer = best
+        if worst_performer is None or worst["gain_loss_pct"] < worst_performer["gain_loss_pct"]:
+            worst_performer = worst
+    
+    if top_5_holdings is None:
+        return None
     
-    # Diversification recommendations
-    if risk_metrics["top_5_concentration"] > 50:
-        recommendations.append("⚠️ High concentration in top 5 holdings - consider diversifying")
+    total_market_value, total_cost_basis, total_gain_loss = totals
+    performance_metrics = {
+        "total_market_value": total_market_value,
+        "total_cost_basis": total_cost_basis,
+        "total_gain_loss": total_gain_loss,
+        "total_gain_loss_pct": (total_gain_loss / total_cost_basis) * 100,
+        "best_performer": best_performer,
+        "worst_performer": worst_performer
+    }
+    _print_performance(performance_metrics)
     
-    # Sector concentration
-    max_sector_weight = sector_analysis["weight_pct"].max()
-    if max_sector_weight > 30:
-        recommendations.append(f"⚠️ High concentration in {sector_analysis['weight_pct'].idxmax()} sector ({max_sector_weight:.1f}%)")
+    allocations = {}
+    for key, sums in group_sums.items():
+        sums["gain_loss_pct"] = sums.pop("gain_loss_pct_sum") / sums.pop("count")
+        allocations[key] = _finish_allocation(sums.round(2), total_market_value)
+    _print_sector_allocation(allocations["sector"])
+    _print_asset_type_allocation(allocations["asset_type"])
     
-    # Asset type diversification
-    stock_weight = asset_analysis.loc["Stock", "weight_pct"] if "Stock" in asset_analysis.index else 0
-    if stock_weight > 70:
-        recommendations.append("💡 Consider adding more bonds and alternative investments")
+    weighted_beta, weighted_volatility, weighted_sharpe, weighted_max_drawdown = weighted_sums / total_market_value
+    risk_metrics = {
+        "weighted_beta": weighted_beta,
+        "weighted_volatility": weighted_volatility,
+        "weighted_sharpe": weighted_sharpe,
+        "weighted_max_drawdown": weighted_max_drawdown,
+        "top_5_concentration": (top_5_holdings["market_value"].sum() / total_market_value) * 100
+    }
+    _print_risk_metrics(risk_metrics, top_5_holdings, total_market_value)
     
-    # Performance recommendations
-    if performance_metrics["total_gain_loss_pct"] < 5:
-        recommendations.append("📈 Portfolio underperforming - review individual holdings")
+    return performance_metrics, allocations["sector"], allocations["asset_type"], risk_metrics
+
+def generate_recommendations(df, performance_metrics, sector_analysis, asset_analysis, risk_metrics):
+    """Generate portfolio recommendations"""
     
-    # Risk recommendations
-    if risk_metrics["weighted_beta"] > 1.2:
-        recommendations.append("⚠️ High beta portfolio - consider adding defensive assets")
+    # Every value the rules can test or mention, gathered once
+    sector_weights = sector_analysis["weight_pct"].to_numpy(dtype=float)
+    top_sector = int(np.nanargmax(sector_weights)) if sector_weights.size else None
+    context = {
+        "top_5_concentration": risk_metrics["top_5_concentration"],
+        "top_sector": sector_analysis.index[top_sector] if top_sector is not None else None,
+        "max_sector_weight": sector_weights[top_sector] if top_sector is not None else np.nan,
+        "stock_weight": asset_analysis["weight_pct"].get("Stock", 0),
+        "total_gain_loss_pct": performance_metrics["total_gain_loss_pct"],
+        "weighted_beta": risk_metrics["weighted_beta"],
+        "weighted_volatility": risk_metrics["weighted_volatility"]
+    }
     
-    if risk_metrics["weighted_volatility"] > 0.25:
-        recommendations.append("📉 High volatility - consider reducing risk")
+    recommendations = [
+        message.format(**context)
+        for key, compare, threshold, message in RECOMMENDATION_RULES
+        if compare(context[key], threshold)
+    ]
     
     # Print recommendations
     if recommendations:
-        for i, rec in enumerate(recommendations, 1):
-            print(f"{i}. {rec}")
+        lines = [f"{i}. {rec}" for i, rec in enumerate(recommendations, 1)]
     else:
-        print("✅ Portfolio appears well-balanced!")
+        lines = ["✅ Portfolio appears well-balanced!"]
+    _print_section("💡 PORTFOLIO RECOMMENDATIONS", lines)
     
     return recommendations
 
 def main():
     """Main demo function"""
     
-    print("🚀 Finnie Portfolio Analysis Demo")
-    print("Developed by Sankar Subbayya")
-    print("=" * 50)
-    
-    # Load portfolio data
-    df = load_portfolio_data()
-    if df is None:
-        return
-    
-    # Run analyses
-    performance_metrics = analyze_portfolio_performance(df)
-    sector_analysis = analyze_sector_allocation(df)
-    asset_analysis = analyze_asset_type_allocation(df)
-    risk_metrics = analyze_risk_metrics(df)
+    # The report is written section by section; no need to flush on every newline
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=False)
+    
+    print("\n".join(["🚀 Finnie Portfolio Analysis Demo", "Developed by Sankar Subbayya", "=" * 50]))
+    
+    csv_file = "data/portfolio_analysis.csv"
+    if os.path.exists(csv_file) and os.path.getsize(csv_file) > STREAMING_THRESHOLD_BYTES:
+        # Large portfolio - aggregate chunk by chunk instead of loading it whole
+        chunks = load_portfolio_data(csv_file, chunksize=STREAMING_CHUNKSIZE)
+        results = analyze_portfolio_chunks(chunks)
+        if results is None:
+            return
+        df = None
+        performance_metrics, sector_analysis, asset_analysis, risk_metrics = results
+    else:
+        # Load portfolio data
+        df = load_portfolio_data(csv_file)
+        if df is None:
+            return
+        
+        # Run analyses, sharing the portfolio total computed by the performance pass
+        performance_metrics = analyze_portfolio_performance(df)
+        total_value = performance_metrics["total_market_value"]
+        sector_analysis = analyze_sector_allocation(df, total_value)
+        asset_analysis = analyze_asset_type_allocation(df, total_value)
+        risk_metrics = analyze_risk_metrics(df, total_value)
     
     # Generate recommendations
     recommendations = generate_recommendations(df, performance_metrics, sector_analysis, asset_analysis, risk_metrics)
     
-    print("\n🎉 Analysis Complete!")
-    print("📊 This demonstrates the portfolio analysis capabilities of Finnie")
-    print("💡 Upload your own CSV file to the Portfolio tab for personalized analysis")
+    print("\n".join([
+        "\n🎉 Analysis Complete!",
+        "📊 This demonstrates the portfolio analysis capabilities of Finnie",
+        "💡 Upload your own CSV file to the Portfolio tab for personalized analysis"
+    ]))
 
 if __name__ == "__main__":
     main()
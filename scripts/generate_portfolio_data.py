@@ -8,12 +8,103 @@ Developed by Sankar Subbayya
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import random
+from datetime import datetime
 import os
+from concurrent.futures import ProcessPoolExecutor
 
-def generate_sample_portfolio():
-    """Generate a comprehensive sample portfolio with realistic data"""
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Uniform ranges for the risk metrics of each asset type (max_drawdown as a positive magnitude)
+RISK_PROFILES = {
+    "Stock": {"beta": (0.8, 1.5), "volatility": (0.15, 0.35), "sharpe_ratio": (0.8, 1.4), "max_drawdown": (0.05, 0.25)},
+    "ETF": {"beta": (0.7, 1.2), "volatility": (0.10, 0.25), "sharpe_ratio": (1.0, 1.5), "max_drawdown": (0.03, 0.15)},
+    "Bond ETF": {"beta": (0.1, 0.3), "volatility": (0.02, 0.08), "sharpe_ratio": (1.5, 2.5), "max_drawdown": (0.01, 0.05)},
+    "Commodity ETF": {"beta": (0.2, 0.5), "volatility": (0.08, 0.20), "sharpe_ratio": (0.5, 1.2), "max_drawdown": (0.03, 0.12)},
+    "Crypto": {"beta": (1.5, 2.5), "volatility": (0.40, 0.70), "sharpe_ratio": (0.3, 0.8), "max_drawdown": (0.20, 0.50)},
+}
+
+# Risk metrics for asset types without a profile
+DEFAULT_RISK_METRICS = {"beta": 1.0, "volatility": 0.20, "sharpe_ratio": 1.0, "max_drawdown": 0.10}
+
+RISK_METRICS = tuple(DEFAULT_RISK_METRICS)
+
+# Numeric output columns, stored as float32
+FLOAT32_COLUMNS = (
+    "quantity", "purchase_price", "current_price", "market_value", "cost_basis",
+    "gain_loss", "gain_loss_pct", "beta", "volatility_1y", "sharpe_ratio", "max_drawdown"
+)
+
+# (asset types + 1, metrics, 2) table of (low, high) draws for the numba kernel; the last
+# row holds the defaults as zero-width ranges and is used for unknown asset types
+ASSET_TYPE_CODES = {asset_type: code for code, asset_type in enumerate(RISK_PROFILES)}
+RISK_RANGES = np.array(
+    [[ranges[metric] for metric in RISK_METRICS] for ranges in RISK_PROFILES.values()]
+    + [[(DEFAULT_RISK_METRICS[metric],) * 2 for metric in RISK_METRICS]]
+)
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _draw_holdings_parallel(purchase_price, type_codes, risk_ranges, current_price, risk):
+        """Per-holding price variation and risk metric draws, spread across cores"""
+        for i in prange(purchase_price.shape[0]):
+            current_price[i] = max(0.01, purchase_price[i] * np.random.normal(1.0, 0.2))
+            ranges = risk_ranges[type_codes[i]]
+            for m in range(ranges.shape[0]):
+                risk[i, m] = np.random.uniform(ranges[m, 0], ranges[m, 1])
+else:
+    _draw_holdings_parallel = None
+
+def draw_holding_metrics(purchase_price, asset_type, rng=None):
+    """Draw current prices and risk metrics for each holding
+    
+    Returns the current prices and a dict of risk metric arrays keyed by RISK_METRICS.
+    Passing a Generator makes the draws reproducible; otherwise the parallel numba
+    kernel is used when available.
+    """
+    
+    n = len(purchase_price)
+    if rng is None and _draw_holdings_parallel is not None:
+        type_codes = np.array(
+            [ASSET_TYPE_CODES.get(t, len(RISK_PROFILES)) for t in asset_type], dtype=np.int8
+        )
+        current_price = np.empty(n)
+        risk_values = np.empty((n, len(RISK_METRICS)))
+        _draw_holdings_parallel(purchase_price, type_codes, RISK_RANGES, current_price, risk_values)
+        return current_price, dict(zip(RISK_METRICS, risk_values.T))
+    
+    if rng is None:
+        rng = np.random.default_rng()
+    
+    # Generate current prices with some realistic variation (20% standard deviation)
+    price_variation = rng.normal(1.0, 0.2, size=n)
+    current_price = np.maximum(0.01, purchase_price * price_variation)
+    
+    # Generate risk metrics based on asset type, one draw per asset class
+    risk = {metric: np.full(n, default) for metric, default in DEFAULT_RISK_METRICS.items()}
+    for profile_type, ranges in RISK_PROFILES.items():
+        mask = asset_type == profile_type
+        count = int(mask.sum())
+        if not count:
+            continue
+        for metric, (low, high) in ranges.items():
+            risk[metric][mask] = rng.uniform(low, high, size=count)
+    
+    return current_price, risk
+
+def generate_sample_portfolio(seed=None):
+    """Generate a comprehensive sample portfolio with realistic data
+    
+    ``seed`` makes the generated portfolio reproducible.
+    """
     
     # Define portfolio holdings
     holdings = [
@@ -69,76 +160,77 @@ def generate_sample_portfolio():
     # Generate random purchase dates within the last year
     start_date = datetime(2023, 1, 1)
     end_date = datetime(2023, 12, 31)
+    days_diff = (end_date - start_date).days
+    rng = np.random.default_rng(seed)
+    offsets = rng.integers(0, days_diff, size=len(holdings), endpoint=True)
+    # Day-resolution datetime64 values format as YYYY-MM-DD in one vectorized cast
+    purchase_dates = (np.datetime64(start_date.date()) + offsets).astype(str)
     
-    portfolio_data = []
+    # Columnar view of the holdings
+    n = len(holdings)
+    symbol = np.array([holding["symbol"] for holding in holdings])
+    quantity = np.array([holding["quantity"] for holding in holdings], dtype=float)
+    purchase_price = np.array([holding["purchase_price"] for holding in holdings], dtype=float)
+    sector = np.array([holding["sector"] for holding in holdings])
+    asset_type = np.array([holding["asset_type"] for holding in holdings])
     
-    for holding in holdings:
-        # Generate random purchase date
-        days_diff = (end_date - start_date).days
-        random_days = random.randint(0, days_diff)
-        purchase_date = start_date + timedelta(days=random_days)
-        
-        # Generate current price with some realistic variation
-        price_variation = np.random.normal(1.0, 0.2)  # 20% standard deviation
-        current_price = max(0.01, holding["purchase_price"] * price_variation)
-        
-        # Calculate metrics
-        market_value = holding["quantity"] * current_price
-        cost_basis = holding["quantity"] * holding["purchase_price"]
-        gain_loss = market_value - cost_basis
-        gain_loss_pct = (gain_loss / cost_basis) * 100 if cost_basis > 0 else 0
-        
-        # Generate risk metrics based on asset type
-        if holding["asset_type"] == "Stock":
-            beta = np.random.uniform(0.8, 1.5)
-            volatility = np.random.uniform(0.15, 0.35)
-            sharpe_ratio = np.random.uniform(0.8, 1.4)
-            max_drawdown = -np.random.uniform(0.05, 0.25)
-        elif holding["asset_type"] == "ETF":
-            beta = np.random.uniform(0.7, 1.2)
-            volatility = np.random.uniform(0.10, 0.25)
-            sharpe_ratio = np.random.uniform(1.0, 1.5)
-            max_drawdown = -np.random.uniform(0.03, 0.15)
-        elif holding["asset_type"] == "Bond ETF":
-            beta = np.random.uniform(0.1, 0.3)
-            volatility = np.random.uniform(0.02, 0.08)
-            sharpe_ratio = np.random.uniform(1.5, 2.5)
-            max_drawdown = -np.random.uniform(0.01, 0.05)
-        elif holding["asset_type"] == "Commodity ETF":
-            beta = np.random.uniform(0.2, 0.5)
-            volatility = np.random.uniform(0.08, 0.20)
-            sharpe_ratio = np.random.uniform(0.5, 1.2)
-            max_drawdown = -np.random.uniform(0.03, 0.12)
-        elif holding["asset_type"] == "Crypto":
-            beta = np.random.uniform(1.5, 2.5)
-            volatility = np.random.uniform(0.40, 0.70)
-            sharpe_ratio = np.random.uniform(0.3, 0.8)
-            max_drawdown = -np.random.uniform(0.20, 0.50)
-        else:
-            beta = 1.0
-            volatility = 0.20
-            sharpe_ratio = 1.0
-            max_drawdown = -0.10
-        
-        portfolio_data.append({
-            "symbol": holding["symbol"],
-            "quantity": holding["quantity"],
-            "purchase_price": holding["purchase_price"],
-            "purchase_date": purchase_date.strftime("%Y-%m-%d"),
-            "sector": holding["sector"],
-            "asset_type": holding["asset_type"],
-            "current_price": round(current_price, 2),
-            "market_value": round(market_value, 2),
-            "cost_basis": round(cost_basis, 2),
-            "gain_loss": round(gain_loss, 2),
-            "gain_loss_pct": round(gain_loss_pct, 2),
-            "beta": round(beta, 2),
-            "volatility_1y": round(volatility, 2),
-            "sharpe_ratio": round(sharpe_ratio, 2),
-            "max_drawdown": round(max_drawdown, 2)
-        })
-    
-    return pd.DataFrame(portfolio_data)
+    # Draw current prices and risk metrics; unseeded runs may use the parallel numba kernel
+    current_price, risk = draw_holding_metrics(purchase_price, asset_type, rng if seed is not None else None)
+    
+    # Calculate metrics
+    market_value = quantity * current_price
+    cost_basis = quantity * purchase_price
+    gain_loss = market_value - cost_basis
+    gain_loss_pct = np.divide(gain_loss * 100, cost_basis, out=np.zeros(n), where=cost_basis > 0)
+    
+    portfolio_df = pd.DataFrame({
+        "symbol": symbol,
+        "quantity": quantity,
+        "purchase_price": purchase_price,
+        "purchase_date": purchase_dates,
+        "sector": sector,
+        "asset_type": asset_type,
+        "current_price": np.round(current_price, 2),
+        "market_value": np.round(market_value, 2),
+        "cost_basis": np.round(cost_basis, 2),
+        "gain_loss": np.round(gain_loss, 2),
+        "gain_loss_pct": np.round(gain_loss_pct, 2),
+        "beta": np.round(risk["beta"], 2),
+        "volatility_1y": np.round(risk["volatility"], 2),
+        "sharpe_ratio": np.round(risk["sharpe_ratio"], 2),
+        "max_drawdown": np.round(-risk["max_drawdown"], 2)
+    })
+    
+    # float32 is ample for prices and ratios; sectors and asset types are low-cardinality
+    return portfolio_df.astype({
+        **{column: "float32" for column in FLOAT32_COLUMNS},
+        "sector": "category",
+        "asset_type": "category"
+    })
+
+def generate_portfolios(n_portfolios, seed=None, max_workers=None):
+    """Generate many independent sample portfolios in parallel processes
+    
+    Each portfolio gets its own child of ``SeedSequence(seed)``, so the streams are
+    independent and the whole batch is reproducible for a given seed. Returns one
+    DataFrame with a ``portfolio_id`` column.
+    """
+    
+    seeds = np.random.SeedSequence(seed).spawn(n_portfolios)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        portfolios = list(executor.map(generate_sample_portfolio, seeds))
+    
+    for portfolio_id, portfolio_df in enumerate(portfolios):
+        portfolio_df.insert(0, "portfolio_id", portfolio_id)
+    return pd.concat(portfolios, ignore_index=True)
+
+def write_csv(df, path):
+    """Write a DataFrame to CSV, using pyarrow's multi-threaded writer when available"""
+    
+    if pa is None:
+        df.to_csv(path, index=False)
+        return
+    pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), path)
 
 def generate_portfolio_summary(df):
     """Generate portfolio summary statistics"""
@@ -152,11 +244,11 @@ def generate_portfolio_summary(df):
     df["weight_pct"] = (df["market_value"] / total_market_value) * 100
     
     # Sector allocation
-    sector_allocation = df.groupby("sector")["market_value"].sum().sort_values(ascending=False)
+    sector_allocation = df.groupby("sector", observed=True)["market_value"].sum().sort_values(ascending=False)
     sector_allocation_pct = (sector_allocation / total_market_value) * 100
     
     # Asset type allocation
-    asset_allocation = df.groupby("asset_type")["market_value"].sum().sort_values(ascending=False)
+    asset_allocation = df.groupby("asset_type", observed=True)["market_value"].sum().sort_values(ascending=False)
     asset_allocation_pct = (asset_allocation / total_market_value) * 100
     
     summary = {
@@ -186,37 +278,39 @@ def main():
     portfolio_df = generate_sample_portfolio()
     
     # Save basic portfolio CSV
-    portfolio_df[["symbol", "quantity", "purchase_price", "purchase_date", "sector", "asset_type"]].to_csv(
-        "data/sample_portfolio.csv", index=False
+    write_csv(
+        portfolio_df[["symbol", "quantity", "purchase_price", "purchase_date", "sector", "asset_type"]],
+        "data/sample_portfolio.csv"
     )
     print("✅ Created data/sample_portfolio.csv")
     
     # Save detailed portfolio CSV
-    portfolio_df.to_csv("data/portfolio_analysis.csv", index=False)
+    write_csv(portfolio_df, "data/portfolio_analysis.csv")
     print("✅ Created data/portfolio_analysis.csv")
     
     # Generate portfolio summary
     summary = generate_portfolio_summary(portfolio_df)
     
-    # Save summary to file
+    # Save summary to file, built up as lines and written once
+    lines = [
+        "FINNIE PORTFOLIO SUMMARY",
+        "Developed by Sankar Subbayya",
+        "=" * 50,
+        "",
+        f"Total Market Value: ${summary['total_market_value']:,.2f}",
+        f"Total Cost Basis: ${summary['total_cost_basis']:,.2f}",
+        f"Total Gain/Loss: ${summary['total_gain_loss']:,.2f}",
+        f"Total Gain/Loss %: {summary['total_gain_loss_pct']:.2f}%",
+        f"Number of Holdings: {summary['num_holdings']}",
+        "",
+        "SECTOR ALLOCATION:",
+        *(f"  {sector}: {pct:.2f}%" for sector, pct in summary['sector_allocation'].items()),
+        "",
+        "ASSET TYPE ALLOCATION:",
+        *(f"  {asset_type}: {pct:.2f}%" for asset_type, pct in summary['asset_allocation'].items()),
+    ]
     with open("data/portfolio_summary.txt", "w") as f:
-        f.write("FINNIE PORTFOLIO SUMMARY\n")
-        f.write("Developed by Sankar Subbayya\n")
-        f.write("=" * 50 + "\n\n")
-        
-        f.write(f"Total Market Value: ${summary['total_market_value']:,.2f}\n")
-        f.write(f"Total Cost Basis: ${summary['total_cost_basis']:,.2f}\n")
-        f.write(f"Total Gain/Loss: ${summary['total_gain_loss']:,.2f}\n")
-        f.write(f"Total Gain/Loss %: {summary['total_gain_loss_pct']:.2f}%\n")
-        f.write(f"Number of Holdings: {summary['num_holdings']}\n\n")
-        
-        f.write("SECTOR ALLOCATION:\n")
-        for sector, pct in summary['sector_allocation'].items():
-            f.write(f"  {sector}: {pct:.2f}%\n")
-        
-        f.write("\nASSET TYPE ALLOCATION:\n")
-        for asset_type, pct in summary['asset_allocation'].items():
-            f.write(f"  {asset_type}: {pct:.2f}%\n")
+        f.write("\n".join(lines) + "\n")
     
     print("✅ Created data/portfolio_summary.txt")
     
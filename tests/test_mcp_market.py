@@ -0,0 +1,302 @@
+"""
+Tests for the market data service in tools.mcp_market
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+from cachetools import TTLCache
+
+from tools import mcp_market
+from tools.mcp_market import MarketDataService, NewsService
+
+aiohttp = mcp_market.aiohttp
+requires_aiohttp = pytest.mark.skipif(aiohttp is None, reason="aiohttp is not installed")
+
+
+class FakeClock:
+    """Manually advanced timer for TTLCache."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _with_fake_clock(service):
+    clock = FakeClock()
+    service.cache = TTLCache(maxsize=mcp_market.CACHE_MAXSIZE, ttl=service.cache_ttl, timer=clock)
+    return clock
+
+
+def test_quote_cache_expires_after_ttl(monkeypatch):
+    service = MarketDataService(http_cache_dir=None)
+    clock = _with_fake_clock(service)
+    downloads = []
+    monkeypatch.setattr(service, '_download_quotes',
+                        lambda symbols: downloads.append(symbols) or {s: {'symbol': s} for s in symbols})
+
+    service.get_quotes(['AAPL', 'MSFT'])
+    clock.now = service.cache_ttl - 1
+    service.get_quotes(['AAPL', 'MSFT'])
+    assert len(downloads) == 1
+
+    clock.now = service.cache_ttl + 1
+    service.get_quotes(['AAPL', 'MSFT'])
+    assert len(downloads) == 2
+
+
+def test_quote_cache_keys_on_symbol_order(monkeypatch):
+    service = MarketDataService(http_cache_dir=None)
+    downloads = []
+    monkeypatch.setattr(service, '_download_quotes',
+                        lambda symbols: downloads.append(symbols) or {s: {'symbol': s} for s in symbols})
+    service.get_quotes(['AAPL', 'MSFT'])
+    service.get_quotes(['MSFT', 'AAPL'])
+    assert len(downloads) == 2
+
+
+def test_cache_is_bounded():
+    service = MarketDataService(http_cache_dir=None)
+    for i in range(mcp_market.CACHE_MAXSIZE + 10):
+        service._cache_data('quotes', [f'SYM{i}'], {'price': i})
+    assert len(service.cache) == mcp_market.CACHE_MAXSIZE
+    assert service._get_cached_data('quotes', ['SYM0']) is None
+
+
+def test_news_cache_expires_after_ttl(monkeypatch):
+    service = NewsService()
+    clock = _with_fake_clock(service)
+    fetches = []
+    monkeypatch.setattr(service, '_fetch_news',
+                        lambda query, limit: fetches.append(query) or [{'title': query}])
+
+    assert service.search_news_batch(['AAPL', 'AAPL', 'MSFT']) == {
+        'AAPL': [{'title': 'AAPL'}], 'MSFT': [{'title': 'MSFT'}]
+    }
+    service.search_news('AAPL')
+    assert fetches == ['AAPL', 'MSFT']
+
+    clock.now = service.cache_ttl + 1
+    service.search_news('AAPL')
+    assert fetches == ['AAPL', 'MSFT', 'AAPL']
+
+
+def _session_type(service):
+    async def open_session():
+        async with service._client_session() as session:
+            return type(session)
+    return asyncio.run(open_session())
+
+
+@requires_aiohttp
+def test_client_session_uses_disk_cache(tmp_path):
+    pytest.importorskip("aiohttp_client_cache")
+    service = MarketDataService(http_cache_dir=str(tmp_path / 'http'))
+    assert issubclass(_session_type(service), mcp_market.CachedSession)
+    assert (tmp_path / 'http').is_dir()
+
+
+@requires_aiohttp
+def test_client_session_without_cache_dir_is_plain():
+    service = MarketDataService(http_cache_dir=None)
+    session_type = _session_type(service)
+    assert session_type is aiohttp.ClientSession
+
+
+@requires_aiohttp
+def test_client_session_falls_back_without_cache_library(tmp_path, monkeypatch):
+    monkeypatch.setattr(mcp_market, 'CachedSession', None)
+    service = MarketDataService(http_cache_dir=str(tmp_path / 'http'))
+    assert _session_type(service) is aiohttp.ClientSession
+    assert not (tmp_path / 'http').exists()
+
+
+class FakeYahoo:
+    """Local stand-in for Yahoo's cookie, crumb and quote endpoints."""
+
+    def __init__(self, grant_crumb=True):
+        self.grant_crumb = grant_crumb
+        self.crumbs_issued = 0
+        self.quote_requests = 0
+
+    def app(self):
+        from aiohttp import web
+
+        async def cookie(request):
+            response = web.Response(status=404)
+            response.set_cookie('A3', 'session')
+            return response
+
+        async def crumb(request):
+            if not self.grant_crumb or request.cookies.get('A3') != 'session':
+                return web.Response(status=429)
+            self.crumbs_issued += 1
+            return web.Response(text=f'crumb{self.crumbs_issued}')
+
+        async def quote(request):
+            self.quote_requests += 1
+            if request.cookies.get('A3') != 'session' or not request.query.get('crumb', '').startswith('crumb'):
+                return web.Response(status=401)
+            result = [{'symbol': symbol, 'regularMarketPrice': 100.0}
+                      for symbol in request.query['symbols'].split(',')]
+            return web.json_response({'quoteResponse': {'result': result}})
+
+        app = web.Application()
+        app.router.add_get('/cookie', cookie)
+        app.router.add_get('/getcrumb', crumb)
+        app.router.add_get('/quote', quote)
+        return app
+
+
+def _run_against(yahoo, monkeypatch, coro_factory):
+    from aiohttp.test_utils import TestServer
+
+    async def run():
+        async with TestServer(yahoo.app(), host='localhost') as server:
+            monkeypatch.setattr(mcp_market, 'YAHOO_COOKIE_URL', str(server.make_url('/cookie')))
+            monkeypatch.setattr(mcp_market, 'YAHOO_CRUMB_URL', str(server.make_url('/getcrumb')))
+            monkeypatch.setattr(mcp_market, 'YAHOO_QUOTE_URL', str(server.make_url('/quote')))
+            return await coro_factory()
+    return asyncio.run(run())
+
+
+def _no_yfinance(symbols):
+    raise AssertionError(f"unexpected yfinance fallback for {symbols}")
+
+
+@requires_aiohttp
+def test_async_quotes_send_cookie_and_crumb(monkeypatch):
+    yahoo = FakeYahoo()
+    service = MarketDataService(http_cache_dir=None)
+    monkeypatch.setattr(service, '_download_quotes', _no_yfinance)
+    quotes = _run_against(yahoo, monkeypatch, lambda: service.get_quotes_async(['AAPL', 'MSFT']))
+    assert set(quotes) == {'AAPL', 'MSFT'}
+    assert quotes['AAPL']['price'] == 100.0
+    assert yahoo.crumbs_issued == 1
+
+
+@requires_aiohttp
+def test_async_quotes_skip_quote_endpoint_without_crumb(monkeypatch):
+    yahoo = FakeYahoo(grant_crumb=False)
+    service = MarketDataService(http_cache_dir=None)
+    monkeypatch.setattr(service, '_download_quotes', lambda symbols: {s: {'symbol': s} for s in symbols})
+    quotes = _run_against(yahoo, monkeypatch, lambda: service.get_quotes_async(['AAPL']))
+    assert quotes == {'AAPL': {'symbol': 'AAPL'}}
+    assert yahoo.quote_requests == 0
+
+
+@requires_aiohttp
+def test_disk_cache_ignores_the_crumb(tmp_path, monkeypatch):
+    pytest.importorskip("aiohttp_client_cache")
+    yahoo = FakeYahoo()
+
+    async def fetch_twice():
+        # Separate services share only the disk cache, and each gets a fresh crumb
+        for _ in range(2):
+            service = MarketDataService(http_cache_dir=str(tmp_path / 'http'))
+            monkeypatch.setattr(service, '_download_quotes', _no_yfinance)
+            quotes = await service.get_quotes_async(['AAPL'])
+        return quotes
+
+    quotes = _run_against(yahoo, monkeypatch, fetch_twice)
+    assert quotes['AAPL']['price'] == 100.0
+    assert yahoo.crumbs_issued == 2
+    assert yahoo.quote_requests == 1
+
+
+def test_async_quotes_without_aiohttp_use_sync_path(monkeypatch):
+    monkeypatch.setattr(mcp_market, 'aiohttp', None)
+    service = MarketDataService(http_cache_dir=None)
+    monkeypatch.setattr(service, 'get_quotes', lambda symbols: {'AAPL': {'symbol': 'AAPL'}})
+    assert asyncio.run(service.get_quotes_async(['AAPL'])) == {'AAPL': {'symbol': 'AAPL'}}
+
+
+@pytest.mark.parametrize('headers, expected', [
+    ({'Retry-After': '5'}, 5.0),
+    ({'Retry-After': '-3'}, 0.0),
+    ({'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '7'}, 7.0),
+    ({'X-RateLimit-Remaining': '3', 'X-RateLimit-Reset': '7'}, None),
+    ({'Retry-After': 'soon'}, None),
+    ({}, None),
+])
+def test_retry_delay(headers, expected):
+    assert mcp_market._retry_delay(headers) == expected
+
+
+def test_retry_delay_from_http_date_and_epoch():
+    retry_at = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 <= mcp_market._retry_delay({'Retry-After': retry_at}) <= 30
+    reset = str(time.time() + 20)
+    assert 15 <= mcp_market._retry_delay({'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': reset}) <= 20
+
+
+def test_rate_limiter_backs_off_and_recovers():
+    limiter = mcp_market.AdaptiveRateLimiter(max_rate=8.0)
+    limiter.throttle()
+    assert limiter.rate == 4.0
+    for _ in range(10):
+        limiter.throttle()
+    assert limiter.rate == mcp_market.MIN_RATE_PER_SECOND
+    for _ in range(100):
+        limiter.recover()
+    assert limiter.rate == 8.0
+
+
+def test_rate_limiter_waits_for_tokens_and_pauses(monkeypatch):
+    clock = FakeClock()
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(mcp_market.time, 'monotonic', clock)
+    monkeypatch.setattr(mcp_market.asyncio, 'sleep', fake_sleep)
+    limiter = mcp_market.AdaptiveRateLimiter(max_rate=2.0)
+
+    async def acquire(times):
+        for _ in range(times):
+            await limiter.acquire()
+
+    # The bucket starts full, so the burst is free and the next request waits 1/rate
+    asyncio.run(acquire(3))
+    assert sleeps == [pytest.approx(0.5)]
+
+    limiter.pause(10)
+    asyncio.run(acquire(1))
+    assert sleeps[-1] == pytest.approx(10)
+
+
+@requires_aiohttp
+def test_fetch_quote_retries_throttled_requests(monkeypatch):
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    statuses = [429, 503, 200]
+
+    async def quote(request):
+        status = statuses.pop(0)
+        if status != 200:
+            return web.Response(status=status, headers={'Retry-After': '0'})
+        return web.json_response({'quoteResponse': {'result': [{'symbol': 'AAPL'}]}})
+
+    app = web.Application()
+    app.router.add_get('/quote', quote)
+    service = MarketDataService(http_cache_dir=None)
+
+    async def run():
+        async with TestServer(app, host='localhost') as server:
+            monkeypatch.setattr(mcp_market, 'YAHOO_QUOTE_URL', str(server.make_url('/quote')))
+            async with aiohttp.ClientSession() as session:
+                return await service._fetch_quote(session, asyncio.Semaphore(1), ['AAPL'], 'crumb')
+
+    assert asyncio.run(run()) == [{'symbol': 'AAPL'}]
+    assert statuses == []
+    limiter = service._rate_limiter(mcp_market.YAHOO_QUOTE_URL)
+    # Two halvings, then one additive recovery step
+    assert limiter.rate == mcp_market.RATE_LIMIT_PER_SECOND / 4 + mcp_market.RATE_RECOVERY_STEP
@@ -0,0 +1,47 @@
+"""
+Tests for the seeded mock data in tools.portfolio_metrics
+"""
+
+import numpy as np
+
+from tools.portfolio_metrics import PortfolioMetricsCalculator
+
+HOLDINGS = [
+    {'symbol': 'AAPL', 'quantity': 10, 'cost_basis': 150.0},
+    {'symbol': 'MSFT', 'quantity': 5, 'cost_basis': 300.0},
+    {'symbol': 'GOOGL', 'quantity': 3, 'cost_basis': 2500.0},
+]
+
+
+def test_seeded_metrics_are_reproducible():
+    calculator = PortfolioMetricsCalculator()
+    assert calculator.calculate_metrics(HOLDINGS) == calculator.calculate_metrics(HOLDINGS)
+    assert PortfolioMetricsCalculator(seed=7).calculate_metrics(HOLDINGS) == \
+        PortfolioMetricsCalculator(seed=7).calculate_metrics(HOLDINGS)
+
+
+def test_different_seeds_give_different_returns():
+    first = PortfolioMetricsCalculator(seed=1).calculate_metrics(HOLDINGS)
+    second = PortfolioMetricsCalculator(seed=2).calculate_metrics(HOLDINGS)
+    assert first['performance_metrics']['annual_return'] != second['performance_metrics']['annual_return']
+
+
+def test_unseeded_returns_vary_between_calls():
+    calculator = PortfolioMetricsCalculator(seed=None)
+    first = calculator._generate_mock_returns(len(HOLDINGS))
+    second = calculator._generate_mock_returns(len(HOLDINGS))
+    assert not np.array_equal(first, second)
+
+
+def test_benchmark_draws_do_not_repeat_the_returns():
+    # Returns and benchmark come from one stream, so they must not be the same draws
+    calculator = PortfolioMetricsCalculator()
+    rng = calculator._mock_rng()
+    returns = calculator._generate_mock_returns(len(HOLDINGS), rng=rng)
+    benchmark = rng.normal(0.0005, 0.015, len(returns))
+    assert abs(np.corrcoef(returns, benchmark)[0, 1]) < 0.3
+
+
+def test_information_ratio_is_finite():
+    metrics = PortfolioMetricsCalculator().calculate_metrics(HOLDINGS)
+    assert np.isfinite(metrics['performance_metrics']['information_ratio'])
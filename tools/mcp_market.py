@@ -2,24 +2,172 @@
 MCP Market Tools - Real-time market data integration
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import numpy as np
+import pandas as pd
 import yfinance as yf
+from cachetools import TTLCache
 import requests
 import time
 import logging
-from datetime import datetime, timedelta
-import json
+import threading
+from functools import lru_cache
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from contextlib import nullcontext
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    from aiohttp_client_cache import CachedSession, SQLiteBackend
+except ImportError:
+    CachedSession = None
 
 logger = logging.getLogger(__name__)
 
+YAHOO_QUOTE_URL = "https://query1.finance.yahoo.com/v7/finance/quote"
+# The quote endpoint rejects requests without the session cookie set here and its matching crumb
+YAHOO_COOKIE_URL = "https://fc.yahoo.com"
+YAHOO_CRUMB_URL = "https://query1.finance.yahoo.com/v1/test/getcrumb"
+YAHOO_HEADERS = {'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36'}
+QUOTE_BATCH_SIZE = 50  # symbols per comma-joined quote request
+MAX_CONNECTIONS_PER_HOST = 64
+QUOTE_TIMEOUT = 10  # seconds
+CACHE_MAXSIZE = 1024  # entries per service cache
+RELEVANCE_THRESHOLD = 0.8  # minimum relevance for a news article to be returned
+MAX_QUOTE_RETRIES = 3
+RETRY_STATUSES = (429, 503)
+RATE_LIMIT_PER_SECOND = 10.0  # requests per host before any throttling
+MIN_RATE_PER_SECOND = 0.5
+RATE_RECOVERY_STEP = 0.5  # requests/second regained per successful response
+
+
+# Mock calendar events as (days from today, event) pairs
+MOCK_CALENDAR_EVENTS = (
+    (0, {
+        'time': '10:00 AM',
+        'event': 'Consumer Price Index',
+        'impact': 'High',
+        'forecast': '3.2%',
+        'description': 'Monthly inflation data release'
+    }),
+    (1, {
+        'time': '2:00 PM',
+        'event': 'Federal Reserve Meeting',
+        'impact': 'High',
+        'forecast': 'Rate Decision',
+        'description': 'FOMC interest rate decision'
+    }),
+    (3, {
+        'time': '8:30 AM',
+        'event': 'Non-Farm Payrolls',
+        'impact': 'High',
+        'forecast': '200K',
+        'description': 'Monthly employment data'
+    }),
+)
+
+MOCK_SECTOR_PERFORMANCE = {
+    'Technology': {'return': 2.5, 'volume': 1000000},
+    'Healthcare': {'return': 1.8, 'volume': 800000},
+    'Finance': {'return': 0.9, 'volume': 1200000},
+    'Consumer': {'return': 1.2, 'volume': 900000},
+    'Energy': {'return': -0.5, 'volume': 600000},
+    'Industrial': {'return': 0.7, 'volume': 700000},
+    'Materials': {'return': 0.3, 'volume': 500000},
+    'Utilities': {'return': 0.1, 'volume': 400000}
+}
+
+def _most_relevant(articles: List[Dict[str, Any]], key: str, limit: int) -> List[Dict[str, Any]]:
+    """Up to `limit` articles above the relevance threshold, most relevant first."""
+    if limit <= 0 or not articles:
+        return []
+    scores = np.fromiter((article[key] for article in articles), dtype=np.float64, count=len(articles))
+    candidates = np.flatnonzero(scores > RELEVANCE_THRESHOLD)
+    if candidates.size > limit:
+        # O(N) partial selection, then sort only the survivors
+        candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+    # Ties keep their original order
+    ranked = candidates[np.lexsort((candidates, -scores[candidates]))]
+    return [articles[i] for i in ranked]
+
+@lru_cache(maxsize=None)
+def _log_missing_extra(package: str, fallback: str):
+    """Log once per package that an optional market dependency is missing."""
+    logger.info(f"{package} is not installed ({fallback}); install it with `pip install 'finnie[market]'`")
+
+def _retry_delay(headers) -> Optional[float]:
+    """Seconds to wait according to Retry-After or an exhausted X-RateLimit window."""
+    retry_after = headers.get('Retry-After')
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds())
+            except (TypeError, ValueError):
+                pass
+    if headers.get('X-RateLimit-Remaining') == '0' and headers.get('X-RateLimit-Reset'):
+        try:
+            reset = float(headers['X-RateLimit-Reset'])
+        except ValueError:
+            return None
+        # Reset is either an epoch timestamp or a number of seconds
+        return max(0.0, reset - time.time() if reset > 1e9 else reset)
+    return None
+
+
+class AdaptiveRateLimiter:
+    """Token bucket whose rate halves on throttling responses and recovers on success."""
+
+    def __init__(self, max_rate: float = RATE_LIMIT_PER_SECOND):
+        self.max_rate = max_rate
+        self.rate = max_rate
+        self.tokens = max_rate
+        self.updated = time.monotonic()
+        self.resume_at = 0.0
+
+    async def acquire(self):
+        """Reserve a token, sleeping until it is available or the server's reset passes."""
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        delay = max(self.resume_at - now, -self.tokens / self.rate)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float):
+        """Hold all requests to this host for the given number of seconds."""
+        self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+
+    def throttle(self):
+        """Back off multiplicatively after the host signals it is overloaded."""
+        self.rate = max(MIN_RATE_PER_SECOND, self.rate / 2)
+
+    def recover(self):
+        """Regain rate additively after a successful response."""
+        self.rate = min(self.max_rate, self.rate + RATE_RECOVERY_STEP)
+
+
 class MarketDataService:
     """Service for fetching real-time market data."""
     
-    def __init__(self, alpha_vantage_key: Optional[str] = None):
+    def __init__(self, alpha_vantage_key: Optional[str] = None,
+                 http_cache_dir: Optional[str] = '.finnie_cache/http'):
         self.alpha_vantage_key = alpha_vantage_key
-        self.cache = {}
         self.cache_ttl = 60  # 1 minute cache
-        self.rate_limit_delay = 0.1  # 100ms between requests
+        self.cache = TTLCache(maxsize=CACHE_MAXSIZE, ttl=self.cache_ttl)
+        self.cache_lock = threading.Lock()  # TTLCache is not thread-safe
+        self.rate_limiters: Dict[str, AdaptiveRateLimiter] = {}
+        # On-disk HTTP cache shared across runs and processes; set http_cache_dir=None to disable
+        self._http_cache_dir = Path(http_cache_dir) if http_cache_dir else None
     
     def get_quotes(self, symbols: List[str]) -> Dict[str, Any]:
         """Get real-time quotes for symbols."""
@@ -29,52 +177,8 @@ class MarketDataService:
             if cached_data:
                 return cached_data
             
-            # Fetch data from yfinance
-            quotes = {}
-            for symbol in symbols:
-                try:
-                    ticker = yf.Ticker(symbol)
-                    info = ticker.info
-                    hist = ticker.history(period="1d")
-                    
-                    if not hist.empty:
-                        latest = hist.iloc[-1]
-                        quotes[symbol] = {
-                            'symbol': symbol,
-                            'price': round(latest['Close'], 2),
-                            'change': round(latest['Close'] - latest['Open'], 2),
-                            'change_percent': round(((latest['Close'] - latest['Open']) / latest['Open']) * 100, 2),
-                            'volume': int(latest['Volume']),
-                            'high': round(latest['High'], 2),
-                            'low': round(latest['Low'], 2),
-                            'open': round(latest['Open'], 2),
-                            'timestamp': datetime.now().isoformat()
-                        }
-                    else:
-                        # Fallback to info data
-                        quotes[symbol] = {
-                            'symbol': symbol,
-                            'price': info.get('currentPrice', 0),
-                            'change': info.get('regularMarketChange', 0),
-                            'change_percent': info.get('regularMarketChangePercent', 0),
-                            'volume': info.get('volume', 0),
-                            'high': info.get('dayHigh', 0),
-                            'low': info.get('dayLow', 0),
-                            'open': info.get('open', 0),
-                            'timestamp': datetime.now().isoformat()
-                        }
-                    
-                    # Rate limiting
-                    time.sleep(self.rate_limit_delay)
-                    
-                except Exception as e:
-                    logger.error(f"Error fetching data for {symbol}: {str(e)}")
-                    quotes[symbol] = {
-                        'symbol': symbol,
-                        'error': str(e),
-                        'timestamp': datetime.now().isoformat()
-                    }
-            
+            quotes = self._download_quotes(symbols)
+
             # Cache the results
             self._cache_data('quotes', symbols, quotes)
             
@@ -84,6 +188,198 @@ class MarketDataService:
             logger.error(f"Error in get_quotes: {str(e)}")
             return {}
     
+    async def get_quotes_async(self, symbols: List[str]) -> Dict[str, Any]:
+        """Get real-time quotes concurrently without blocking the event loop."""
+        try:
+            cached_data = self._get_cached_data('quotes', symbols)
+            if cached_data:
+                return cached_data
+
+            if aiohttp is None:
+                _log_missing_extra('aiohttp', 'fetching quotes with yfinance in a worker thread')
+                return await asyncio.to_thread(self.get_quotes, symbols)
+
+            found = await self._gather_quotes(symbols)
+            timestamp = datetime.now().isoformat()
+            missing = [symbol for symbol in symbols if symbol not in found]
+            fallback = await asyncio.to_thread(self._download_quotes, missing) if missing else {}
+            quotes = {
+                symbol: self._yahoo_quote(found[symbol], timestamp) if symbol in found else fallback[symbol]
+                for symbol in symbols
+            }
+
+            # Cache the results
+            self._cache_data('quotes', symbols, quotes)
+
+            return quotes
+
+        except Exception as e:
+            logger.error(f"Error in get_quotes_async: {str(e)}")
+            return {}
+
+    async def _gather_quotes(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch raw Yahoo quotes for all symbols in concurrent batched requests."""
+        semaphore = asyncio.Semaphore(MAX_CONNECTIONS_PER_HOST)
+        connector = aiohttp.TCPConnector(limit_per_host=MAX_CONNECTIONS_PER_HOST)
+        timeout = aiohttp.ClientTimeout(total=QUOTE_TIMEOUT)
+        batches = [symbols[i:i + QUOTE_BATCH_SIZE] for i in range(0, len(symbols), QUOTE_BATCH_SIZE)]
+
+        async with self._client_session(connector=connector, timeout=timeout, headers=YAHOO_HEADERS) as session:
+            crumb = await self._fetch_crumb(session)
+            if crumb is None:
+                # Every batch would be rejected with a 401, so leave all symbols to the yfinance fallback
+                return {}
+            results = await asyncio.gather(
+                *(self._fetch_quote(session, semaphore, batch, crumb) for batch in batches),
+                return_exceptions=True
+            )
+
+        found = {}
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Quote request failed for {','.join(batch)}: {str(result)}")
+                continue
+            for item in result:
+                found[item.get('symbol')] = item
+        return found
+
+    async def _fetch_crumb(self, session: "aiohttp.ClientSession") -> Optional[str]:
+        """Obtain Yahoo's session cookie and crumb once per session, or None if Yahoo refuses."""
+        # The crumb is tied to this session's cookie, so it must never come from the disk cache
+        uncached = session.disabled() if hasattr(session, 'disabled') else nullcontext()
+        try:
+            async with uncached:
+                async with session.get(YAHOO_COOKIE_URL) as response:
+                    await response.read()  # Only the Set-Cookie header matters; the status is usually 404
+                await self._rate_limiter(YAHOO_CRUMB_URL).acquire()
+                async with session.get(YAHOO_CRUMB_URL) as response:
+                    response.raise_for_status()
+                    crumb = (await response.text()).strip()
+        except Exception as e:
+            logger.warning(f"Could not get a Yahoo crumb, using yfinance instead: {str(e)}")
+            return None
+        return crumb or None
+
+    async def _fetch_quote(self, session: "aiohttp.ClientSession", semaphore: asyncio.Semaphore,
+                           symbols: List[str], crumb: str) -> List[Dict[str, Any]]:
+        """Fetch one comma-joined batch from Yahoo's quote endpoint."""
+        limiter = self._rate_limiter(YAHOO_QUOTE_URL)
+        params = {'symbols': ','.join(symbols), 'crumb': crumb}
+        for attempt in range(MAX_QUOTE_RETRIES + 1):
+            await limiter.acquire()
+            async with semaphore:
+                async with session.get(YAHOO_QUOTE_URL, params=params) as response:
+                    delay = _retry_delay(response.headers)
+                    if response.status in RETRY_STATUSES and attempt < MAX_QUOTE_RETRIES:
+                        limiter.throttle()
+                        limiter.pause(delay if delay is not None else 2 ** attempt)
+                        continue
+                    response.raise_for_status()
+                    payload = await response.json(content_type=None)
+            limiter.recover()
+            if delay:
+                limiter.pause(delay)
+            return (payload.get('quoteResponse') or {}).get('result') or []
+
+    def _client_session(self, **kwargs) -> "aiohttp.ClientSession":
+        """aiohttp session, backed by the on-disk HTTP cache when aiohttp-client-cache is installed."""
+        if CachedSession is None or self._http_cache_dir is None:
+            if CachedSession is None and self._http_cache_dir is not None:
+                _log_missing_extra('aiohttp-client-cache', 'async quote requests are not cached on disk')
+            return aiohttp.ClientSession(**kwargs)
+        self._http_cache_dir.mkdir(parents=True, exist_ok=True)
+        # The crumb changes with every session, so leave it out of the cache key
+        backend = SQLiteBackend(str(self._http_cache_dir / 'quotes'), expire_after=self.cache_ttl,
+                                ignored_params=['crumb'])
+        return CachedSession(cache=backend, **kwargs)
+
+    def _rate_limiter(self, url: str) -> AdaptiveRateLimiter:
+        """Get the rate limiter shared by all requests to the url's host."""
+        host = urlparse(url).netloc
+        if host not in self.rate_limiters:
+            self.rate_limiters[host] = AdaptiveRateLimiter()
+        return self.rate_limiters[host]
+
+    @staticmethod
+    def _yahoo_quote(item: Dict[str, Any], timestamp: str) -> Dict[str, Any]:
+        """Map a Yahoo quote payload onto the quote fields returned by get_quotes."""
+        return {
+            'symbol': item.get('symbol'),
+            'price': round(item.get('regularMarketPrice') or 0, 2),
+            'change': round(item.get('regularMarketChange') or 0, 2),
+            'change_percent': round(item.get('regularMarketChangePercent') or 0, 2),
+            'volume': int(item.get('regularMarketVolume') or 0),
+            'high': round(item.get('regularMarketDayHigh') or 0, 2),
+            'low': round(item.get('regularMarketDayLow') or 0, 2),
+            'open': round(item.get('regularMarketOpen') or 0, 2),
+            'timestamp': timestamp
+        }
+
+    def _download_quotes(self, symbols: List[str]) -> Dict[str, Any]:
+        """Fetch quotes for symbols with one batched yfinance request."""
+        data = yf.download(symbols, period="1d", interval="1d", group_by="ticker",
+                           threads=True, progress=False)
+        latest = self._latest_bars(data, symbols)
+        timestamp = datetime.now().isoformat()
+
+        batch = {}
+        if not latest.empty:
+            close, open_ = latest['Close'], latest['Open']
+            change = close - open_
+            frame = pd.DataFrame({
+                'price': close,
+                'change': change,
+                'change_percent': change / open_ * 100,
+                'volume': latest['Volume'].fillna(0),
+                'high': latest['High'],
+                'low': latest['Low'],
+                'open': open_,
+            }).round(2)
+            frame = frame[frame['price'].notna()].astype({'volume': 'int64'})
+            for symbol, row in frame.to_dict('index').items():
+                batch[symbol] = {'symbol': symbol, **row, 'timestamp': timestamp}
+
+        # Symbols missing from the batch fall back to info data
+        quotes = {
+            symbol: batch.get(symbol) or self._info_quote(symbol, timestamp)
+            for symbol in symbols
+        }
+        return quotes
+
+    @staticmethod
+    def _latest_bars(data: pd.DataFrame, symbols: List[str]) -> pd.DataFrame:
+        """Reshape a yf.download result into one row of OHLCV fields per symbol."""
+        if data is None or data.empty:
+            return pd.DataFrame()
+        if isinstance(data.columns, pd.MultiIndex):
+            # group_by="ticker" yields (symbol, field) columns
+            return data.ffill().iloc[-1].unstack()
+        # Older yfinance returns flat columns for a single symbol
+        return data.iloc[[-1]].set_axis(symbols[:1])
+
+    def _info_quote(self, symbol: str, timestamp: str) -> Dict[str, Any]:
+        """Build a quote from ticker info when no price bar is available."""
+        try:
+            info = yf.Ticker(symbol).info
+            return {
+                'symbol': symbol,
+                'price': info.get('currentPrice', 0),
+                'change': info.get('regularMarketChange', 0),
+                'change_percent': info.get('regularMarketChangePercent', 0),
+                'volume': info.get('volume', 0),
+                'high': info.get('dayHigh', 0),
+                'low': info.get('dayLow', 0),
+                'open': info.get('open', 0),
+                'timestamp': timestamp
+            }
+        except Exception as e:
+            logger.error(f"Error fetching data for {symbol}: {str(e)}")
+            return {
+                'symbol': symbol,
+                'error': str(e),
+                'timestamp': timestamp
+            }
+
     def get_market_calendar(self) -> List[Dict[str, Any]]:
         """Get market calendar events."""
         try:
@@ -92,32 +388,11 @@ class MarketDataService:
             if cached_data:
                 return cached_data
             
-            # Mock calendar data (in production, use real API)
+            # Mock calendar data (in production, use real API); only the dates change per call
+            today = datetime.now().date()
             calendar_events = [
-                {
-                    'date': datetime.now().strftime('%Y-%m-%d'),
-                    'time': '10:00 AM',
-                    'event': 'Consumer Price Index',
-                    'impact': 'High',
-                    'forecast': '3.2%',
-                    'description': 'Monthly inflation data release'
-                },
-                {
-                    'date': (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d'),
-                    'time': '2:00 PM',
-                    'event': 'Federal Reserve Meeting',
-                    'impact': 'High',
-                    'forecast': 'Rate Decision',
-                    'description': 'FOMC interest rate decision'
-                },
-                {
-                    'date': (datetime.now() + timedelta(days=3)).strftime('%Y-%m-%d'),
-                    'time': '8:30 AM',
-                    'event': 'Non-Farm Payrolls',
-                    'impact': 'High',
-                    'forecast': '200K',
-                    'description': 'Monthly employment data'
-                }
+                {'date': (today + timedelta(days=day_offset)).isoformat(), **event}
+                for day_offset, event in MOCK_CALENDAR_EVENTS
             ]
             
             # Cache the results
@@ -133,18 +408,18 @@ class MarketDataService:
         """Get relevant news articles."""
         try:
             # Check cache
-            cache_key = f"news_{query}_{limit}"
-            cached_data = self._get_cached_data('news', [cache_key])
+            cached_data = self._get_cached_data('news', [query, limit])
             if cached_data:
                 return cached_data
             
             # Mock news data (in production, use real news API)
+            now = datetime.now()
             news_articles = [
                 {
                     'title': f'Market Update: {query}',
                     'source': 'Financial Times',
                     'url': f'https://ft.com/news/{query.replace(" ", "-")}',
-                    'timestamp': datetime.now() - timedelta(hours=2),
+                    'timestamp': now - timedelta(hours=2),
                     'sentiment': 'positive',
                     'relevance': 0.95,
                     'summary': f'Latest developments in {query} show positive trends...'
@@ -153,7 +428,7 @@ class MarketDataService:
                     'title': f'Analysis: {query} Trends',
                     'source': 'Reuters',
                     'url': f'https://reuters.com/analysis/{query.replace(" ", "-")}',
-                    'timestamp': datetime.now() - timedelta(hours=4),
+                    'timestamp': now - timedelta(hours=4),
                     'sentiment': 'neutral',
                     'relevance': 0.88,
                     'summary': f'Expert analysis of {query} market conditions...'
@@ -162,7 +437,7 @@ class MarketDataService:
                     'title': f'Breaking: {query} News',
                     'source': 'Bloomberg',
                     'url': f'https://bloomberg.com/news/{query.replace(" ", "-")}',
-                    'timestamp': datetime.now() - timedelta(hours=6),
+                    'timestamp': now - timedelta(hours=6),
                     'sentiment': 'negative',
                     'relevance': 0.82,
                     'summary': f'Breaking news about {query} developments...'
@@ -170,11 +445,10 @@ class MarketDataService:
             ]
             
             # Filter by relevance and limit
-            filtered_news = [article for article in news_articles if article['relevance'] > 0.8]
-            filtered_news = filtered_news[:limit]
+            filtered_news = _most_relevant(news_articles, 'relevance', limit)
             
             # Cache the results
-            self._cache_data('news', [cache_key], filtered_news)
+            self._cache_data('news', [query, limit], filtered_news)
             
             return filtered_news
             
@@ -191,16 +465,7 @@ class MarketDataService:
                 return cached_data
             
             # Mock sector data (in production, use real API)
-            sectors = {
-                'Technology': {'return': 2.5, 'volume': 1000000},
-                'Healthcare': {'return': 1.8, 'volume': 800000},
-                'Finance': {'return': 0.9, 'volume': 1200000},
-                'Consumer': {'return': 1.2, 'volume': 900000},
-                'Energy': {'return': -0.5, 'volume': 600000},
-                'Industrial': {'return': 0.7, 'volume': 700000},
-                'Materials': {'return': 0.3, 'volume': 500000},
-                'Utilities': {'return': 0.1, 'volume': 400000}
-            }
+            sectors = {sector: dict(performance) for sector, performance in MOCK_SECTOR_PERFORMANCE.items()}
             
             # Cache the results
             self._cache_data('sectors', [], sectors)
@@ -213,73 +478,33 @@ class MarketDataService:
     
     def _get_cached_data(self, data_type: str, key: List[str]) -> Optional[Any]:
         """Get data from cache if not expired."""
-        cache_key = f"{data_type}_{hash(tuple(key))}"
-        
-        if cache_key in self.cache:
-            data, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < self.cache_ttl:
-                return data
-            else:
-                del self.cache[cache_key]
-        
-        return None
+        with self.cache_lock:
+            return self.cache.get((data_type, tuple(key)))
     
     def _cache_data(self, data_type: str, key: List[str], data: Any):
-        """Cache data with timestamp."""
-        cache_key = f"{data_type}_{hash(tuple(key))}"
-        self.cache[cache_key] = (data, time.time())
+        """Cache data until the TTL expires."""
+        with self.cache_lock:
+            self.cache[(data_type, tuple(key))] = data
 
 class NewsService:
     """Service for fetching financial news."""
     
     def __init__(self, news_api_key: Optional[str] = None):
         self.news_api_key = news_api_key
-        self.cache = {}
         self.cache_ttl = 300  # 5 minutes cache
+        self.cache = TTLCache(maxsize=CACHE_MAXSIZE, ttl=self.cache_ttl)
+        self.cache_lock = threading.Lock()  # TTLCache is not thread-safe
     
     def search_news(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Search for news articles."""
         try:
             # Check cache
-            cache_key = f"news_search_{query}_{limit}"
+            cache_key = ('news_search', query, limit)
             cached_data = self._get_cached_data(cache_key)
             if cached_data:
                 return cached_data
             
-            # Mock news search (in production, use real news API)
-            news_articles = [
-                {
-                    'title': f'Breaking: {query} Market Update',
-                    'source': 'Financial Times',
-                    'url': f'https://ft.com/news/{query.replace(" ", "-")}',
-                    'published_at': datetime.now() - timedelta(hours=1),
-                    'sentiment': 'positive',
-                    'relevance_score': 0.95,
-                    'summary': f'Latest developments in {query} show strong performance...'
-                },
-                {
-                    'title': f'Analysis: {query} Investment Outlook',
-                    'source': 'Reuters',
-                    'url': f'https://reuters.com/analysis/{query.replace(" ", "-")}',
-                    'published_at': datetime.now() - timedelta(hours=3),
-                    'sentiment': 'neutral',
-                    'relevance_score': 0.88,
-                    'summary': f'Expert analysis of {query} market conditions...'
-                },
-                {
-                    'title': f'Market Watch: {query} Trends',
-                    'source': 'Bloomberg',
-                    'url': f'https://bloomberg.com/markets/{query.replace(" ", "-")}',
-                    'published_at': datetime.now() - timedelta(hours=5),
-                    'sentiment': 'negative',
-                    'relevance_score': 0.82,
-                    'summary': f'Market analysis of {query} shows mixed signals...'
-                }
-            ]
-            
-            # Filter by relevance and limit
-            filtered_news = [article for article in news_articles if article['relevance_score'] > 0.8]
-            filtered_news = filtered_news[:limit]
+            filtered_news = self._fetch_news(query, limit)
             
             # Cache the results
             self._cache_data(cache_key, filtered_news)
@@ -290,42 +515,108 @@ class NewsService:
             logger.error(f"Error in search_news: {str(e)}")
             return []
     
+    def search_news_batch(self, queries: List[str], limit: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """Search news for several queries, fetching only the ones not already cached."""
+        try:
+            # Deduplicate queries and split them into cached and uncached in one pass
+            with self.cache_lock:
+                results = {query: self.cache.get(('news_search', query, limit)) for query in dict.fromkeys(queries)}
+            
+            for query, cached_data in results.items():
+                if not cached_data:
+                    results[query] = self._fetch_news(query, limit)
+                    self._cache_data(('news_search', query, limit), results[query])
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error in search_news_batch: {str(e)}")
+            return {}
+    
+    def _fetch_news(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """Fetch news articles for one query."""
+        # Mock news search (in production, use real news API)
+        now = datetime.now()
+        news_articles = [
+            {
+                'title': f'Breaking: {query} Market Update',
+                'source': 'Financial Times',
+                'url': f'https://ft.com/news/{query.replace(" ", "-")}',
+                'published_at': now - timedelta(hours=1),
+                'sentiment': 'positive',
+                'relevance_score': 0.95,
+                'summary': f'Latest developments in {query} show strong performance...'
+            },
+            {
+                'title': f'Analysis: {query} Investment Outlook',
+                'source': 'Reuters',
+                'url': f'https://reuters.com/analysis/{query.replace(" ", "-")}',
+                'published_at': now - timedelta(hours=3),
+                'sentiment': 'neutral',
+                'relevance_score': 0.88,
+                'summary': f'Expert analysis of {query} market conditions...'
+            },
+            {
+                'title': f'Market Watch: {query} Trends',
+                'source': 'Bloomberg',
+                'url': f'https://bloomberg.com/markets/{query.replace(" ", "-")}',
+                'published_at': now - timedelta(hours=5),
+                'sentiment': 'negative',
+                'relevance_score': 0.82,
+                'summary': f'Market analysis of {query} shows mixed signals...'
+            }
+        ]
+        
+        # Filter by relevance and limit
+        filtered_news = _most_relevant(news_articles, 'relevance_score', limit)
+        
+        return filtered_news
+    
     def get_ticker_news(self, symbol: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Get news for a specific ticker."""
         return self.search_news(symbol, limit)
     
-    def _get_cached_data(self, key: str) -> Optional[Any]:
+    def _get_cached_data(self, key: Tuple) -> Optional[Any]:
         """Get data from cache if not expired."""
-        if key in self.cache:
-            data, timestamp = self.cache[key]
-            if time.time() - timestamp < self.cache_ttl:
-                return data
-            else:
-                del self.cache[key]
-        
-        return None
+        with self.cache_lock:
+            return self.cache.get(key)
     
-    def _cache_data(self, key: str, data: Any):
-        """Cache data with timestamp."""
-        self.cache[key] = (data, time.time())
+    def _cache_data(self, key: Tuple, data: Any):
+        """Cache data until the TTL expires."""
+        with self.cache_lock:
+            self.cache[key] = data
 
 # MCP Tool Functions
+@lru_cache(maxsize=1)
+def _market_service() -> MarketDataService:
+    """Shared service so its cache and rate limiters persist across tool calls."""
+    return MarketDataService()
+
+@lru_cache(maxsize=1)
+def _news_service() -> NewsService:
+    """Shared news service so its cache persists across tool calls."""
+    return NewsService()
+
 def get_quotes(symbols: List[str]) -> Dict[str, Any]:
     """MCP tool function to get quotes."""
-    service = MarketDataService()
-    return service.get_quotes(symbols)
+    return _market_service().get_quotes(symbols)
+
+async def get_quotes_async(symbols: List[str]) -> Dict[str, Any]:
+    """MCP tool function to get quotes from async callers."""
+    return await _market_service().get_quotes_async(symbols)
 
 def get_market_calendar() -> List[Dict[str, Any]]:
     """MCP tool function to get market calendar."""
-    service = MarketDataService()
-    return service.get_market_calendar()
+    return _market_service().get_market_calendar()
 
 def search_news(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     """MCP tool function to search news."""
-    service = NewsService()
-    return service.search_news(query, limit)
+    return _news_service().search_news(query, limit)
+
+def search_news_batch(queries: List[str], limit: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+    """MCP tool function to search news for several queries."""
+    return _news_service().search_news_batch(queries, limit)
 
 def get_sector_performance() -> Dict[str, Any]:
     """MCP tool function to get sector performance."""
-    service = MarketDataService()
-    return service.get_sector_performance()
+    return _market_service().get_sector_performance()
@@ -2,19 +2,181 @@
 Portfolio Metrics Tools - Calculate portfolio performance metrics
 """
 
-from typing import Dict, Any, List, Optional, Tuple
-import pandas as pd
+from typing import Dict, Any, List, Optional, Tuple, NamedTuple
 import numpy as np
 from datetime import datetime, timedelta
 import logging
+from functools import lru_cache
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 logger = logging.getLogger(__name__)
 
+
+def _tail_positions(n: int, q: float) -> Tuple[int, int, float]:
+    """Order-statistic neighbours and interpolation fraction of the q-th percentile."""
+    position = q * (n - 1)
+    lower = int(position)
+    return lower, min(lower + 1, n - 1), position - lower
+
+
+def _tail_risk(tail: np.ndarray, lower: int, upper: int, fraction: float) -> Tuple[float, float]:
+    """VaR (linear-interpolated percentile) and expected shortfall from the sorted lower tail."""
+    var = tail[lower] + (tail[upper] - tail[lower]) * fraction
+    return var, tail[:lower + 1].mean()
+
+
+def _drawdown(returns: np.ndarray) -> np.ndarray:
+    """Drawdown from the running peak of cumulative returns."""
+    cumulative_returns = np.cumprod(1 + returns)
+    peak = np.maximum.accumulate(cumulative_returns)
+    return (cumulative_returns - peak) / peak
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _return_stats_kernel(returns):
+        """Fused mean, drawdown, volatility and downside-deviation passes over one return series."""
+        n = returns.shape[0]
+        total = 0.0
+        downside_total = 0.0
+        downside_count = 0
+        cumulative = 1.0
+        peak = 0.0
+        max_drawdown = 0.0
+        for i in range(n):
+            r = returns[i]
+            total += r
+            if r < 0.0:
+                downside_total += r
+                downside_count += 1
+            cumulative *= 1.0 + r
+            if i == 0 or cumulative > peak:
+                peak = cumulative
+            drawdown = (cumulative - peak) / peak
+            if drawdown < max_drawdown:
+                max_drawdown = drawdown
+        
+        mean = total / n
+        downside_mean = downside_total / max(downside_count, 1)
+        squares = 0.0
+        downside_squares = 0.0
+        for i in range(n):
+            r = returns[i]
+            squares += (r - mean) ** 2
+            if r < 0.0:
+                downside_squares += (r - downside_mean) ** 2
+        
+        downside_deviation = 0.0
+        if downside_count > 0:
+            downside_deviation = np.sqrt(downside_squares / downside_count) * np.sqrt(252.0)
+        return mean * 252, np.sqrt(squares / n) * np.sqrt(252.0), downside_deviation, max_drawdown
+else:
+    _return_stats_kernel = None
+
+
+def _regression_betas(returns: np.ndarray, benchmark_returns: np.ndarray) -> np.ndarray:
+    """OLS beta of every row of an (N, T) returns matrix against one benchmark series."""
+    centered_benchmark = benchmark_returns - benchmark_returns.mean()
+    variance = centered_benchmark @ centered_benchmark
+    if variance == 0:
+        return np.zeros(returns.shape[0])
+    # Row-centring is unnecessary: the centred benchmark already sums to zero
+    return (returns @ centered_benchmark) / variance
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _concentration_kernel(sorted_weights):
+        """Sum of squares, total and rank-weighted sum of sorted weights in one pass."""
+        squares = 0.0
+        total = 0.0
+        ranked = 0.0
+        for i in range(sorted_weights.shape[0]):
+            w = sorted_weights[i]
+            squares += w * w
+            total += w
+            ranked += (i + 1) * w
+        return squares, total, ranked
+else:
+    _concentration_kernel = None
+
+
+def _concentration(sorted_weights: np.ndarray) -> Tuple[float, float]:
+    """HHI and Gini coefficient of ascending-sorted portfolio weights."""
+    n = len(sorted_weights)
+    if _concentration_kernel is not None:
+        hhi, total, ranked = _concentration_kernel(np.ascontiguousarray(sorted_weights, dtype=np.float64))
+    else:
+        hhi = sorted_weights @ sorted_weights
+        total = sorted_weights.sum()
+        ranked = np.arange(1, n + 1) @ sorted_weights
+    gini = 2 * ranked / (n * total) - (n + 1) / n
+    return hhi, gini
+
+
+class ReturnStats(NamedTuple):
+    """Return statistics shared by the risk and performance metrics."""
+    annual_return: float
+    volatility: float
+    downside_deviation: float
+    max_drawdown: float
+    var_95: float
+    var_99: float
+    es_95: float
+    es_99: float
+
+
+def _compute_return_stats(returns: np.ndarray) -> Optional[ReturnStats]:
+    """Compute every return statistic once, or None for no returns."""
+    if len(returns) == 0:
+        return None
+    
+    # VaR and Expected Shortfall: one O(N) partition, then sort only the ~5% lower tail
+    returns = np.ascontiguousarray(returns, dtype=np.float64)
+    tail_95 = _tail_positions(len(returns), 0.05)
+    tail_99 = _tail_positions(len(returns), 0.01)
+    tail = np.sort(np.partition(returns, tail_95[1])[:tail_95[1] + 1])
+    var_95, es_95 = _tail_risk(tail, *tail_95)
+    var_99, es_99 = _tail_risk(tail, *tail_99)
+    
+    if _return_stats_kernel is not None:
+        annual_return, volatility, downside_deviation, max_drawdown = _return_stats_kernel(returns)
+    else:
+        downside_returns = returns[returns < 0]
+        annual_return = np.mean(returns) * 252
+        volatility = np.std(returns) * np.sqrt(252)
+        downside_deviation = np.std(downside_returns) * np.sqrt(252) if len(downside_returns) > 0 else 0
+        max_drawdown = _drawdown(returns).min()
+    
+    return ReturnStats(
+        annual_return=annual_return,
+        volatility=volatility,
+        downside_deviation=downside_deviation,
+        max_drawdown=max_drawdown,
+        var_95=var_95,
+        var_99=var_99,
+        es_95=es_95,
+        es_99=es_99
+    )
+
+
 class PortfolioMetricsCalculator:
     """Calculator for portfolio performance metrics."""
     
-    def __init__(self, risk_free_rate: float = 0.02):
+    def __init__(self, risk_free_rate: float = 0.02, seed: Optional[int] = 42):
         self.risk_free_rate = risk_free_rate
+        # Each analysis draws all of its mock data in sequence from one Generator seeded with
+        # `seed`, so results are reproducible; seed=None gives fresh randomness on each call
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+    
+    def _mock_rng(self) -> np.random.Generator:
+        """Generator for one analysis's mock draws: freshly seeded when a seed is set, shared otherwise."""
+        return np.random.default_rng(self.seed) if self.seed is not None else self.rng
     
     def calculate_metrics(self, holdings: List[Dict[str, Any]], 
                          market_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -23,26 +185,35 @@ class PortfolioMetricsCalculator:
             if not holdings:
                 return self._empty_metrics()
             
-            # Convert holdings to DataFrame
-            df_holdings = pd.DataFrame(holdings)
+            # Pull the numeric columns straight out of the holdings
+            quantities = np.array([holding['quantity'] for holding in holdings])
+            cost_basis = np.array([holding['cost_basis'] for holding in holdings])
             
             # Basic portfolio info
-            total_value = (df_holdings['quantity'] * df_holdings['cost_basis']).sum()
-            num_holdings = len(df_holdings)
+            position_values = quantities * cost_basis
+            total_value = position_values.sum()
+            num_holdings = len(holdings)
+            
+            # Nothing to weight: skip the return simulation instead of propagating NaN weights
+            if not np.isfinite(total_value) or total_value <= 0:
+                return self._empty_metrics()
             
             # Calculate weights
-            weights = (df_holdings['quantity'] * df_holdings['cost_basis']) / total_value
+            weights = position_values / total_value
             
-            # Mock returns (in production, use real market data)
-            returns = self._generate_mock_returns(num_holdings)
+            # Mock returns (in production, use real market data); the benchmark and allocation
+            # draws continue the same stream so they stay independent of the returns
+            rng = self._mock_rng()
+            returns = self._generate_mock_returns(num_holdings, rng=rng)
             
             # Calculate metrics
+            stats = _compute_return_stats(returns)
             metrics = {
-                'basic_info': self._calculate_basic_info(df_holdings, total_value, num_holdings),
-                'risk_metrics': self._calculate_risk_metrics(returns),
-                'performance_metrics': self._calculate_performance_metrics(returns),
-                'diversification_metrics': self._calculate_diversification_metrics(weights, df_holdings),
-                'allocation_metrics': self._calculate_allocation_metrics(df_holdings, weights)
+                'basic_info': self._calculate_basic_info(quantities, total_value, num_holdings),
+                'risk_metrics': self._calculate_risk_metrics(stats),
+                'performance_metrics': self._calculate_performance_metrics(returns, stats, rng),
+                'diversification_metrics': self._calculate_diversification_metrics(weights),
+                'allocation_metrics': self._calculate_allocation_metrics(weights, rng)
             }
             
             return metrics
@@ -61,92 +232,61 @@ class PortfolioMetricsCalculator:
             'allocation_metrics': {}
         }
     
-    def _generate_mock_returns(self, num_holdings: int, days: int = 252) -> np.ndarray:
+    def _generate_mock_returns(self, num_holdings: int, days: int = 252,
+                               rng: Optional[np.random.Generator] = None) -> np.ndarray:
         """Generate mock returns for portfolio analysis."""
         # In production, this would use real market data
-        np.random.seed(42)  # For reproducible results
-        return np.random.normal(0.0008, 0.02, days)  # ~20% annual volatility, 20% annual return
+        if rng is None:
+            rng = self._mock_rng()
+        return rng.normal(0.0008, 0.02, days)  # ~20% annual volatility, 20% annual return
     
-    def _calculate_basic_info(self, df_holdings: pd.DataFrame, total_value: float, num_holdings: int) -> Dict[str, Any]:
+    def _calculate_basic_info(self, quantities: np.ndarray, total_value: float, num_holdings: int) -> Dict[str, Any]:
         """Calculate basic portfolio information."""
         return {
             'total_value': total_value,
             'num_holdings': num_holdings,
             'avg_position_size': total_value / num_holdings if num_holdings > 0 else 0,
-            'largest_position': df_holdings['quantity'].max() if not df_holdings.empty else 0,
-            'smallest_position': df_holdings['quantity'].min() if not df_holdings.empty else 0,
-            'total_quantity': df_holdings['quantity'].sum() if not df_holdings.empty else 0
+            'largest_position': quantities.max() if len(quantities) > 0 else 0,
+            'smallest_position': quantities.min() if len(quantities) > 0 else 0,
+            'total_quantity': quantities.sum() if len(quantities) > 0 else 0
         }
     
-    def _calculate_risk_metrics(self, returns: np.ndarray) -> Dict[str, Any]:
+    def _calculate_risk_metrics(self, stats: Optional[ReturnStats]) -> Dict[str, Any]:
         """Calculate risk-related metrics."""
-        if len(returns) == 0:
+        if stats is None:
             return {}
         
-        # Volatility (annualized)
-        volatility = np.std(returns) * np.sqrt(252)
-        
-        # Value at Risk (95% confidence)
-        var_95 = np.percentile(returns, 5)
-        var_99 = np.percentile(returns, 1)
-        
-        # Expected Shortfall (Conditional VaR)
-        es_95 = returns[returns <= var_95].mean()
-        es_99 = returns[returns <= var_99].mean()
-        
-        # Maximum Drawdown
-        cumulative_returns = (1 + returns).cumprod()
-        peak = cumulative_returns.expanding().max()
-        drawdown = (cumulative_returns - peak) / peak
-        max_drawdown = drawdown.min()
-        
-        # Downside deviation
-        downside_returns = returns[returns < 0]
-        downside_deviation = np.std(downside_returns) * np.sqrt(252) if len(downside_returns) > 0 else 0
-        
         return {
-            'volatility': volatility,
-            'var_95': var_95,
-            'var_99': var_99,
-            'expected_shortfall_95': es_95,
-            'expected_shortfall_99': es_99,
-            'max_drawdown': max_drawdown,
-            'downside_deviation': downside_deviation
+            'volatility': stats.volatility,
+            'var_95': stats.var_95,
+            'var_99': stats.var_99,
+            'expected_shortfall_95': stats.es_95,
+            'expected_shortfall_99': stats.es_99,
+            'max_drawdown': stats.max_drawdown,
+            'downside_deviation': stats.downside_deviation
         }
     
-    def _calculate_performance_metrics(self, returns: np.ndarray) -> Dict[str, Any]:
+    def _calculate_performance_metrics(self, returns: np.ndarray, stats: Optional[ReturnStats],
+                                       rng: np.random.Generator) -> Dict[str, Any]:
         """Calculate performance-related metrics."""
-        if len(returns) == 0:
+        if stats is None:
             return {}
         
-        # Annualized return
-        annual_return = np.mean(returns) * 252
-        
-        # Sharpe ratio
-        excess_return = annual_return - self.risk_free_rate
-        volatility = np.std(returns) * np.sqrt(252)
-        sharpe_ratio = excess_return / volatility if volatility > 0 else 0
-        
-        # Sortino ratio
-        downside_returns = returns[returns < 0]
-        downside_deviation = np.std(downside_returns) * np.sqrt(252) if len(downside_returns) > 0 else 0
-        sortino_ratio = excess_return / downside_deviation if downside_deviation > 0 else 0
-        
-        # Calmar ratio
-        cumulative_returns = (1 + returns).cumprod()
-        peak = cumulative_returns.expanding().max()
-        drawdown = (cumulative_returns - peak) / peak
-        max_drawdown = abs(drawdown.min())
-        calmar_ratio = annual_return / max_drawdown if max_drawdown > 0 else 0
+        # Sharpe, Sortino and Calmar ratios
+        excess_return = stats.annual_return - self.risk_free_rate
+        sharpe_ratio = excess_return / stats.volatility if stats.volatility > 0 else 0
+        sortino_ratio = excess_return / stats.downside_deviation if stats.downside_deviation > 0 else 0
+        max_drawdown = abs(stats.max_drawdown)
+        calmar_ratio = stats.annual_return / max_drawdown if max_drawdown > 0 else 0
         
         # Information ratio (vs benchmark)
-        benchmark_returns = np.random.normal(0.0005, 0.015, len(returns))  # Mock benchmark
+        benchmark_returns = rng.normal(0.0005, 0.015, len(returns))  # Mock benchmark
         active_returns = returns - benchmark_returns
         tracking_error = np.std(active_returns) * np.sqrt(252)
         information_ratio = np.mean(active_returns) * 252 / tracking_error if tracking_error > 0 else 0
         
         return {
-            'annual_return': annual_return,
+            'annual_return': stats.annual_return,
             'sharpe_ratio': sharpe_ratio,
             'sortino_ratio': sortino_ratio,
             'calmar_ratio': calmar_ratio,
@@ -154,24 +294,20 @@ class PortfolioMetricsCalculator:
             'excess_return': excess_return
         }
     
-    def _calculate_diversification_metrics(self, weights: pd.Series, df_holdings: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_diversification_metrics(self, weights: np.ndarray) -> Dict[str, Any]:
         """Calculate diversification metrics."""
         if len(weights) == 0:
             return {}
         
-        # Herfindahl-Hirschman Index (HHI)
-        hhi = (weights ** 2).sum()
+        # Herfindahl-Hirschman Index (HHI) and Gini coefficient (concentration measure)
+        sorted_weights = np.sort(weights)
+        hhi, gini = _concentration(sorted_weights)
         
         # Effective number of holdings
         effective_holdings = 1 / hhi if hhi > 0 else 0
         
         # Concentration ratio (top 5 holdings)
-        top_5_weights = weights.nlargest(5).sum()
-        
-        # Gini coefficient (concentration measure)
-        sorted_weights = np.sort(weights)
-        n = len(sorted_weights)
-        gini = (2 * np.sum((np.arange(1, n + 1) * sorted_weights))) / (n * np.sum(sorted_weights)) - (n + 1) / n
+        top_5_weights = sorted_weights[-5:].sum()
         
         return {
             'hhi': hhi,
@@ -181,23 +317,23 @@ class PortfolioMetricsCalculator:
             'diversification_ratio': 1 / hhi if hhi > 0 else 0
         }
     
-    def _calculate_allocation_metrics(self, df_holdings: pd.DataFrame, weights: pd.Series) -> Dict[str, Any]:
+    def _calculate_allocation_metrics(self, weights: np.ndarray, rng: np.random.Generator) -> Dict[str, Any]:
         """Calculate allocation metrics."""
-        if df_holdings.empty:
+        if len(weights) == 0:
             return {}
         
         # Mock sector allocation (in production, use real sector data)
         sectors = ['Technology', 'Healthcare', 'Finance', 'Consumer', 'Energy', 'Other']
-        sector_weights = np.random.dirichlet(np.ones(len(sectors)))
+        sector_weights = rng.dirichlet(np.ones(len(sectors)))
         sector_allocation = dict(zip(sectors, sector_weights))
         
         # Mock asset class allocation
         asset_classes = ['Stocks', 'Bonds', 'Cash', 'Alternatives']
-        asset_weights = np.random.dirichlet(np.ones(len(asset_classes)))
+        asset_weights = rng.dirichlet(np.ones(len(asset_classes)))
         asset_allocation = dict(zip(asset_classes, asset_weights))
         
         # Position size distribution
-        position_sizes = weights.values
+        position_sizes = weights
         size_metrics = {
             'mean_position_size': np.mean(position_sizes),
             'median_position_size': np.median(position_sizes),
@@ -215,33 +351,48 @@ class PortfolioMetricsCalculator:
         }
     
     def calculate_correlation_matrix(self, holdings: List[Dict[str, Any]], 
-                                   market_data: Optional[Dict[str, Any]] = None) -> np.ndarray:
-        """Calculate correlation matrix for holdings."""
+                                   market_data: Optional[Dict[str, Any]] = None,
+                                   returns: Optional[np.ndarray] = None) -> np.ndarray:
+        """Calculate correlation matrix for holdings.
+        
+        `returns` is an optional (N, T) matrix of holding returns; float32 is plenty for correlations.
+        """
         if not holdings or len(holdings) < 2:
             return np.array([])
         
-        # Mock correlation matrix (in production, use real returns)
+        if returns is not None:
+            return np.corrcoef(returns, dtype=np.float32)
+        
+        # Mock correlation matrix (in production, use real returns): draw only the upper triangle
         n = len(holdings)
-        correlation_matrix = np.random.uniform(-0.5, 0.8, (n, n))
-        correlation_matrix = (correlation_matrix + correlation_matrix.T) / 2  # Make symmetric
-        np.fill_diagonal(correlation_matrix, 1.0)  # Diagonal should be 1
+        upper = np.triu_indices(n, k=1)
+        values = self._mock_rng().uniform(-0.5, 0.8, upper[0].size).astype(np.float32)
+        correlation_matrix = np.eye(n, dtype=np.float32)  # Diagonal should be 1
+        correlation_matrix[upper] = values
+        correlation_matrix[upper[::-1]] = values  # Mirror to keep it symmetric
         
         return correlation_matrix
     
     def calculate_beta(self, holdings: List[Dict[str, Any]], 
-                      benchmark_symbol: str = 'SPY') -> Dict[str, float]:
-        """Calculate beta for each holding against benchmark."""
+                      benchmark_symbol: str = 'SPY',
+                      returns: Optional[np.ndarray] = None,
+                      benchmark_returns: Optional[np.ndarray] = None) -> Dict[str, float]:
+        """Calculate beta for each holding against benchmark.
+        
+        `returns` is an (N, T) matrix of holding returns aligned with `benchmark_returns` (T,).
+        """
         if not holdings:
             return {}
         
-        betas = {}
-        for holding in holdings:
-            symbol = holding.get('symbol', '')
+        symbols = [holding.get('symbol', '') for holding in holdings]
+        if returns is not None and benchmark_returns is not None:
+            betas = _regression_betas(np.asarray(returns, dtype=np.float64),
+                                      np.asarray(benchmark_returns, dtype=np.float64))
+        else:
             # Mock beta calculation (in production, use real regression)
-            beta = np.random.uniform(0.5, 1.5)
-            betas[symbol] = beta
+            betas = self._mock_rng().uniform(0.5, 1.5, len(holdings))
         
-        return betas
+        return dict(zip(symbols, betas.tolist()))
     
     def calculate_tracking_error(self, holdings: List[Dict[str, Any]], 
                                benchmark_symbol: str = 'SPY') -> float:
@@ -250,26 +401,31 @@ class PortfolioMetricsCalculator:
             return 0.0
         
         # Mock tracking error (in production, use real calculation)
-        return np.random.uniform(0.02, 0.08)  # 2-8% tracking error
+        return self._mock_rng().uniform(0.02, 0.08)  # 2-8% tracking error
 
 # MCP Tool Functions
+@lru_cache(maxsize=1)
+def _metrics_calculator() -> PortfolioMetricsCalculator:
+    """Shared calculator reused across tool calls."""
+    return PortfolioMetricsCalculator()
+
 def calculate_portfolio_metrics(holdings: List[Dict[str, Any]]) -> Dict[str, Any]:
     """MCP tool function to calculate portfolio metrics."""
-    calculator = PortfolioMetricsCalculator()
+    calculator = _metrics_calculator()
     return calculator.calculate_metrics(holdings)
 
 def calculate_correlation_matrix(holdings: List[Dict[str, Any]]) -> List[List[float]]:
     """MCP tool function to calculate correlation matrix."""
-    calculator = PortfolioMetricsCalculator()
+    calculator = _metrics_calculator()
     matrix = calculator.calculate_correlation_matrix(holdings)
     return matrix.tolist() if matrix.size > 0 else []
 
 def calculate_beta(holdings: List[Dict[str, Any]], benchmark: str = 'SPY') -> Dict[str, float]:
     """MCP tool function to calculate beta."""
-    calculator = PortfolioMetricsCalculator()
+    calculator = _metrics_calculator()
     return calculator.calculate_beta(holdings, benchmark)
 
 def calculate_tracking_error(holdings: List[Dict[str, Any]], benchmark: str = 'SPY') -> float:
     """MCP tool function to calculate tracking error."""
-    calculator = PortfolioMetricsCalculator()
+    calculator = _metrics_calculator()
     return calculator.calculate_tracking_error(holdings, benchmark)